@@ -1,14 +1,67 @@
 # algorithms.py - Contains the search algorithms for the word ladder game
 
 from collections import deque
-import heapq
+from itertools import count
 import time
+from frontier import HeapFrontier
 from node import Node
 
-def bfs_search(word_tree, start, target):
+# Every search takes record_costs: only when True are the per-neighbor g/h/f
+# entries in GameValues["costs"] recorded. They cost one dict per pushed word
+# and only the hint cost table reads them, so they are off by default.
+# Every search also takes profile, an optional SearchProfile (see
+# instrumentation.py) that times its pushes, pops and expansions.
+# max_nodes and time_limit (seconds) bound a search: once either runs out it
+# returns the path to its most promising frontier word instead, which stops
+# short of the target, and flags GameValues["approximate"].
+# UCS, GBFS and A* also take frontier, a factory for their priority queue
+# (see frontier.py), a plain HeapFrontier when not given.
+
+# Deadlines are checked every this many expansions, reading the clock is not free
+DEADLINE_CHECK_EVERY = 32
+
+def _finish(GameValues, start_ns, profile):
+    """Store the elapsed time (and the profile, if any) in the search statistics"""
+    elapsed_ns = time.perf_counter_ns() - start_ns
+    GameValues["execution_time"] = elapsed_ns / 1e9
+    if profile is not None:
+        profile.total_ns = elapsed_ns
+        GameValues["profile"] = profile.summary()
+
+def _deadline(start_ns, time_limit):
+    return None if time_limit is None else start_ns + int(time_limit * 1e9)
+
+def _budget_exhausted(nodes_explored, max_nodes, deadline_ns):
+    """"nodes" or "time" once a search has used up its budget, otherwise None"""
+    if max_nodes is not None and nodes_explored > max_nodes:
+        return "nodes"
+    if (deadline_ns is not None and nodes_explored % DEADLINE_CHECK_EVERY == 0
+            and time.perf_counter_ns() > deadline_ns):
+        return "time"
+    return None
+
+def _stopped_early(GameValues, start_ns, profile, path, reason):
+    """Flag a partial answer from a search that ran out of budget"""
+    GameValues["approximate"] = True
+    GameValues["budget_exhausted"] = reason
+    _finish(GameValues, start_ns, profile)
+    return path, GameValues
+
+def _hamming_estimate(target):
+    """Sort key for frontier nodes of the searches without a heuristic: f = g + Hamming"""
+    def estimate(node):
+        h = calculate_hamming_distance(node.word, target)
+        return node.path_cost + h, h
+    return estimate
+
+def bfs_search(word_tree, start, target, record_costs=False, profile=None,
+               max_nodes=None, time_limit=None):
     """Breadth-First Search algorithm"""
     # Initialize with start node
     queue = deque([Node(start)])
+    push, pop = queue.append, queue.popleft
+    if profile is not None:
+        push, pop = profile.timed_push(push), profile.timed_pop(pop)
     visited = set([start])
     GameValues = {
         "nodes_explored": 0, 
@@ -17,12 +70,14 @@ def bfs_search(word_tree, start, target):
         "execution_time": 0
     }
     
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
+    deadline_ns = _deadline(start_ns, time_limit)
+    budgeted = max_nodes is not None or time_limit is not None
     
     while queue:
         GameValues["max_queue_size"] = max(GameValues["max_queue_size"], len(queue))
         
-        current_node = queue.popleft()
+        current_node = pop()
         current_word = current_node.word
         GameValues["nodes_explored"] += 1
         
@@ -31,25 +86,40 @@ def bfs_search(word_tree, start, target):
             path = current_node.get_path()
             GameValues["costs"] = {word: {"g": i, "h": "N/A", "f": "N/A"} 
                               for i, word in enumerate(path)}
-            GameValues["execution_time"] = time.time() - start_time
+            _finish(GameValues, start_ns, profile)
             return path, GameValues
         
+        if budgeted:
+            exhausted = _budget_exhausted(GameValues["nodes_explored"], max_nodes, deadline_ns)
+            if exhausted:
+                best = min([current_node, *queue], key=_hamming_estimate(target))
+                return _stopped_early(GameValues, start_ns, profile, best.get_path(), exhausted)
+        
         # Check all neighbors
         for neighbor in word_tree.get(current_word, []):
             if neighbor not in visited:
                 visited.add(neighbor)
                 new_node = Node(neighbor, current_node, current_node.path_cost + 1)
-                queue.append(new_node)
-                GameValues["costs"][neighbor] = {"g": new_node.path_cost, "h": "N/A", "f": "N/A"}
+                push(new_node)
+                if record_costs:
+                    GameValues["costs"][neighbor] = {"g": new_node.path_cost, "h": "N/A", "f": "N/A"}
+        if profile is not None:
+            profile.expanded(current_word, len(queue))
     
-    GameValues["execution_time"] = time.time() - start_time
+    _finish(GameValues, start_ns, profile)
     return [], GameValues
 
-def ucs_search(word_tree, start, target):
+def ucs_search(word_tree, start, target, record_costs=False, profile=None,
+               max_nodes=None, time_limit=None, frontier=None):
     """Uniform Cost Search algorithm"""
     start_node = Node(start)
-    # Priority queue with (path_cost, id, node) to break ties
-    pr_queue = [(start_node.path_cost, id(start_node), start_node)]
+    # Lowest path cost first, ties in insertion order
+    tie_breaker = count()
+    pr_queue = (frontier or HeapFrontier)()
+    push, pop = pr_queue.operations()
+    push((start_node.path_cost, next(tie_breaker), start_node))
+    if profile is not None:
+        push, pop = profile.timed_push(push), profile.timed_pop(pop)
     visited = set()
     GameValues = {
         "nodes_explored": 0, 
@@ -58,19 +128,24 @@ def ucs_search(word_tree, start, target):
         "execution_time": 0
     }
     
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
+    deadline_ns = _deadline(start_ns, time_limit)
+    budgeted = max_nodes is not None or time_limit is not None
     
     while pr_queue:
         GameValues["max_queue_size"] = max(GameValues["max_queue_size"], len(pr_queue))
         
         # Get node with lowest path cost
-        _, _, current_node = heapq.heappop(pr_queue)
+        entry = pop()
+        if entry is None:
+            break  # Only entries overtaken by cheaper pushes were left
+        current_node = entry[2]
         current_word = current_node.word
         GameValues["nodes_explored"] += 1
         
         if current_word == target:
             path = current_node.get_path()
-            GameValues["execution_time"] = time.time() - start_time
+            _finish(GameValues, start_ns, profile)
             return path, GameValues
         
         if current_word in visited:
@@ -78,25 +153,43 @@ def ucs_search(word_tree, start, target):
             
         visited.add(current_word)
         
+        if budgeted:
+            exhausted = _budget_exhausted(GameValues["nodes_explored"], max_nodes, deadline_ns)
+            if exhausted:
+                candidates = [current_node, *pr_queue.nodes()]
+                best = min(candidates, key=_hamming_estimate(target))
+                return _stopped_early(GameValues, start_ns, profile, best.get_path(), exhausted)
+        
         # Check all neighbors
         for neighbor in word_tree.get(current_word, []):
             if neighbor not in visited:
                 new_cost = current_node.path_cost + 1
                 new_node = Node(neighbor, current_node, new_cost)
-                GameValues["costs"][neighbor] = {"g": new_cost, "h": "N/A", "f": new_cost}
-                heapq.heappush(pr_queue, (new_node.path_cost, id(new_node), new_node))
+                if record_costs:
+                    GameValues["costs"][neighbor] = {"g": new_cost, "h": "N/A", "f": new_cost}
+                push((new_cost, next(tie_breaker), new_node))
+        if profile is not None:
+            profile.expanded(current_word, len(pr_queue))
     
-    GameValues["execution_time"] = time.time() - start_time
+    _finish(GameValues, start_ns, profile)
     return [], GameValues
 
-def gbfs_search(word_tree, start, target):
+def gbfs_search(word_tree, start, target, record_costs=False, heuristic=None, profile=None,
+                max_nodes=None, time_limit=None, frontier=None):
     """Greedy Best-First Search algorithm"""
+    # Hamming distance unless a stronger heuristic(word, target) is given
+    heuristic = heuristic or calculate_hamming_distance
     # Calculate initial heuristic
-    start_heuristic = calculate_hamming_distance(start, target)
+    start_heuristic = heuristic(start, target)
     start_node = Node(start, None, 0, start_heuristic)
     
-    # Priority queue with (heuristic_cost, id, node) to break ties
-    pr_queue = [(start_node.heuristic_cost, id(start_node), start_node)]
+    # Lowest heuristic cost first, ties in insertion order
+    tie_breaker = count()
+    pr_queue = (frontier or HeapFrontier)()
+    push, pop = pr_queue.operations()
+    push((start_node.heuristic_cost, next(tie_breaker), start_node))
+    if profile is not None:
+        push, pop = profile.timed_push(push), profile.timed_pop(pop)
     visited = set()
     GameValues = {
         "nodes_explored": 0, 
@@ -105,19 +198,24 @@ def gbfs_search(word_tree, start, target):
         "execution_time": 0
     }
     
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
+    deadline_ns = _deadline(start_ns, time_limit)
+    budgeted = max_nodes is not None or time_limit is not None
     
     while pr_queue:
         GameValues["max_queue_size"] = max(GameValues["max_queue_size"], len(pr_queue))
         
         # Get node with lowest heuristic cost
-        _, _, current_node = heapq.heappop(pr_queue)
+        entry = pop()
+        if entry is None:
+            break  # Only entries overtaken by cheaper pushes were left
+        current_node = entry[2]
         current_word = current_node.word
         GameValues["nodes_explored"] += 1
         
         if current_word == target:
             path = current_node.get_path()
-            GameValues["execution_time"] = time.time() - start_time
+            _finish(GameValues, start_ns, profile)
             return path, GameValues
         
         if current_word in visited:
@@ -125,25 +223,43 @@ def gbfs_search(word_tree, start, target):
             
         visited.add(current_word)
         
+        if budgeted:
+            exhausted = _budget_exhausted(GameValues["nodes_explored"], max_nodes, deadline_ns)
+            if exhausted:
+                candidates = [current_node, *pr_queue.nodes()]
+                best = min(candidates, key=lambda node: (node.heuristic_cost, node.path_cost))
+                return _stopped_early(GameValues, start_ns, profile, best.get_path(), exhausted)
+        
         # Check all neighbors
         for neighbor in word_tree.get(current_word, []):
             if neighbor not in visited:
-                heuristic = calculate_hamming_distance(neighbor, target)
-                new_node = Node(neighbor, current_node, current_node.path_cost + 1, heuristic)
-                GameValues["costs"][neighbor] = {"g": new_node.path_cost, "h": heuristic, "f": heuristic}
-                heapq.heappush(pr_queue, (new_node.heuristic_cost, id(new_node), new_node))
+                heuristic_cost = heuristic(neighbor, target)
+                new_node = Node(neighbor, current_node, current_node.path_cost + 1, heuristic_cost)
+                if record_costs:
+                    GameValues["costs"][neighbor] = {"g": new_node.path_cost, "h": heuristic_cost, "f": heuristic_cost}
+                push((heuristic_cost, next(tie_breaker), new_node))
+        if profile is not None:
+            profile.expanded(current_word, len(pr_queue))
     
-    GameValues["execution_time"] = time.time() - start_time
+    _finish(GameValues, start_ns, profile)
     return [], GameValues
 
-def a_star_search(word_tree, start, target):
+def a_star_search(word_tree, start, target, record_costs=False, heuristic=None, profile=None,
+                  max_nodes=None, time_limit=None, frontier=None):
     """A* Search algorithm"""
+    # Hamming distance unless a stronger (admissible) heuristic(word, target) is given
+    heuristic = heuristic or calculate_hamming_distance
     # Calculate initial heuristic
-    start_heuristic = calculate_hamming_distance(start, target)
+    start_heuristic = heuristic(start, target)
     start_node = Node(start, None, 0, start_heuristic)
     
-    # Priority queue with (total_cost, id, node) to break ties
-    pr_queue = [(start_node.total_cost, id(start_node), start_node)]
+    # Lowest total cost first, ties in insertion order
+    tie_breaker = count()
+    pr_queue = (frontier or HeapFrontier)()
+    push, pop = pr_queue.operations()
+    push((start_node.total_cost, next(tie_breaker), start_node))
+    if profile is not None:
+        push, pop = profile.timed_push(push), profile.timed_pop(pop)
     visited = set()
     GameValues = {
         "nodes_explored": 0, 
@@ -152,19 +268,24 @@ def a_star_search(word_tree, start, target):
         "execution_time": 0
     }
     
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
+    deadline_ns = _deadline(start_ns, time_limit)
+    budgeted = max_nodes is not None or time_limit is not None
     
     while pr_queue:
         GameValues["max_queue_size"] = max(GameValues["max_queue_size"], len(pr_queue))
         
         # Get node with lowest total cost
-        _, _, current_node = heapq.heappop(pr_queue)
+        entry = pop()
+        if entry is None:
+            break  # Only entries overtaken by cheaper pushes were left
+        current_node = entry[2]
         current_word = current_node.word
         GameValues["nodes_explored"] += 1
         
         if current_word == target:
             path = current_node.get_path()
-            GameValues["execution_time"] = time.time() - start_time
+            _finish(GameValues, start_ns, profile)
             return path, GameValues
         
         if current_word in visited:
@@ -172,19 +293,199 @@ def a_star_search(word_tree, start, target):
             
         visited.add(current_word)
         
+        if budgeted:
+            exhausted = _budget_exhausted(GameValues["nodes_explored"], max_nodes, deadline_ns)
+            if exhausted:
+                candidates = [current_node, *pr_queue.nodes()]
+                best = min(candidates, key=lambda node: (node.total_cost, node.heuristic_cost))
+                return _stopped_early(GameValues, start_ns, profile, best.get_path(), exhausted)
+        
         # Check all neighbors
         for neighbor in word_tree.get(current_word, []):
             if neighbor not in visited:
                 new_path_cost = current_node.path_cost + 1
-                heuristic = calculate_hamming_distance(neighbor, target)
-                total_cost = new_path_cost + heuristic
-                new_node = Node(neighbor, current_node, new_path_cost, heuristic)
-                GameValues["costs"][neighbor] = {"g": new_path_cost, "h": heuristic, "f": total_cost}
-                heapq.heappush(pr_queue, (total_cost, id(new_node), new_node))
+                heuristic_cost = heuristic(neighbor, target)
+                total_cost = new_path_cost + heuristic_cost
+                new_node = Node(neighbor, current_node, new_path_cost, heuristic_cost)
+                if record_costs:
+                    GameValues["costs"][neighbor] = {"g": new_path_cost, "h": heuristic_cost, "f": total_cost}
+                push((total_cost, next(tie_breaker), new_node))
+        if profile is not None:
+            profile.expanded(current_word, len(pr_queue))
     
-    GameValues["execution_time"] = time.time() - start_time
+    _finish(GameValues, start_ns, profile)
     return [], GameValues
 
+def _bidirectional_partial_path(word_tree, start, target, forward_parents, backward_parents):
+    """Best path a stopped bidirectional search can offer, at least one move long
+
+    Only the forward search has paths from the start, so it heads for the
+    reached word closest to the target, never the start itself. If the
+    forward side never expanded, it takes one move, preferring a neighbor
+    the backward search reached (which is on a path to the target).
+    """
+    reached = [word for word in forward_parents if word != start]
+    if reached:
+        best = min(reached, key=lambda word: calculate_hamming_distance(word, target))
+        return path_from_parents(forward_parents, best)
+    neighbors = word_tree.get(start, [])
+    if not neighbors:
+        return [start]
+    best = min(neighbors, key=lambda word: (word not in backward_parents,
+                                            calculate_hamming_distance(word, target)))
+    return [start, best]
+
+def bidirectional_bfs_search(word_tree, start, target, record_costs=False, profile=None,
+                             max_nodes=None, time_limit=None):
+    """Bidirectional Breadth-First Search algorithm
+
+    Expands whole BFS levels from both ends, always growing the smaller
+    frontier, and stops when the two searches meet. Word graphs are
+    undirected, so the same neighbor lists serve both directions.
+    """
+    forward_parents = {start: None}
+    backward_parents = {target: None}
+    forward_frontier = [start]
+    backward_frontier = [target]
+    GameValues = {
+        "nodes_explored": 0, 
+        "max_queue_size": 1 if start == target else 2, 
+        "costs": {},
+        "execution_time": 0
+    }
+    
+    start_ns = time.perf_counter_ns()
+    deadline_ns = _deadline(start_ns, time_limit)
+    budgeted = max_nodes is not None or time_limit is not None
+    meeting_word = start if start == target else None
+    
+    while meeting_word is None and forward_frontier and backward_frontier:
+        GameValues["max_queue_size"] = max(GameValues["max_queue_size"], 
+                                           len(forward_frontier) + len(backward_frontier))
+        
+        # Expand one full level of the smaller frontier
+        if len(forward_frontier) <= len(backward_frontier):
+            frontier, parents, other_parents = forward_frontier, forward_parents, backward_parents
+        else:
+            frontier, parents, other_parents = backward_frontier, backward_parents, forward_parents
+        
+        next_frontier = []
+        push = next_frontier.append if profile is None else profile.timed_push(next_frontier.append)
+        for current_word in frontier:
+            GameValues["nodes_explored"] += 1
+            if budgeted:
+                exhausted = _budget_exhausted(GameValues["nodes_explored"], max_nodes, deadline_ns)
+                if exhausted:
+                    path = _bidirectional_partial_path(word_tree, start, target, forward_parents,
+                                                       backward_parents)
+                    return _stopped_early(GameValues, start_ns, profile, path, exhausted)
+            for neighbor in word_tree.get(current_word, []):
+                if neighbor in parents:
+                    continue
+                parents[neighbor] = current_word
+                # The other search already reached this word, the two halves meet here
+                if neighbor in other_parents:
+                    meeting_word = neighbor
+                    break
+                push(neighbor)
+            if profile is not None:
+                profile.expanded(current_word, len(forward_frontier) + len(backward_frontier) +
+                                 len(next_frontier))
+            if meeting_word is not None:
+                break
+        
+        if frontier is forward_frontier:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
+    
+    if meeting_word is None:
+        _finish(GameValues, start_ns, profile)
+        return [], GameValues
+    
+    # Walk back to the start, then forward to the target
+    path = []
+    word = meeting_word
+    while word is not None:
+        path.append(word)
+        word = forward_parents[word]
+    path.reverse()
+    word = backward_parents[meeting_word]
+    while word is not None:
+        path.append(word)
+        word = backward_parents[word]
+    
+    GameValues["costs"] = {word: {"g": i, "h": "N/A", "f": "N/A"} 
+                           for i, word in enumerate(path)}
+    _finish(GameValues, start_ns, profile)
+    return path, GameValues
+
+def bfs_distances(word_tree, source, max_distance=None):
+    """Breadth-First Search from one word to every word in its component
+
+    Returns a dict of word -> number of moves from `source`. With
+    `max_distance` only words at most that many moves away are reached.
+    """
+    distances = {source: 0}
+    queue = deque([source])
+    while queue:
+        current_word = queue.popleft()
+        next_distance = distances[current_word] + 1
+        if max_distance is not None and next_distance > max_distance:
+            break  # BFS order, every word left in the queue is as far or farther
+        for neighbor in word_tree.get(current_word, []):
+            if neighbor not in distances:
+                distances[neighbor] = next_distance
+                queue.append(neighbor)
+    return distances
+
+def bfs_parents(word_tree, source, targets=None):
+    """Breadth-First Search tree from one word
+
+    Returns a dict of word -> parent word (None for `source`). When `targets`
+    is given the search stops as soon as all of them have been reached.
+    """
+    parents = {source: None}
+    remaining = set(targets) - {source} if targets is not None else None
+    queue = deque([source])
+    while queue:
+        if remaining is not None and not remaining:
+            break  # Every target has a parent, no need to finish the component
+        current_word = queue.popleft()
+        for neighbor in word_tree.get(current_word, []):
+            if neighbor not in parents:
+                parents[neighbor] = current_word
+                queue.append(neighbor)
+                if remaining is not None:
+                    remaining.discard(neighbor)
+    return parents
+
+def path_from_parents(parents, target):
+    """Follow a BFS tree back from `target`, [] if the target was not reached"""
+    if target not in parents:
+        return []
+    path = []
+    word = target
+    while word is not None:
+        path.append(word)
+        word = parents[word]
+    return path[::-1]
+
+# Search functions by the names used in the game settings
+SEARCH_ALGORITHMS = {
+    "A*": a_star_search,
+    "BFS": bfs_search,
+    "Bidirectional BFS": bidirectional_bfs_search,
+    "UCS": ucs_search,
+    "GBFS": gbfs_search
+}
+
+# Searches that accept a heuristic(word, target) argument
+HEURISTIC_ALGORITHMS = {"A*", "GBFS"}
+
+# Searches that accept a frontier argument, see frontier.py
+FRONTIER_ALGORITHMS = {"A*", "UCS", "GBFS"}
+
 # Helper function for all algorithms
 def calculate_hamming_distance(word1, word2):
     """Calculate Hamming distance between two words (number of differing positions)"""
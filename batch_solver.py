@@ -0,0 +1,153 @@
+# batch_solver.py - Contains the batch (many-to-many) shortest ladder solver
+#
+# Solve a file of pairs, one "start target" per line (or a JSON object with
+# "start" and "target"), and stream the results as JSONL:
+#     python batch_solver.py pairs.txt --output results.jsonl --processes 8
+
+import argparse
+from array import array
+from collections import defaultdict
+import json
+import multiprocessing
+import sys
+import time
+from algorithms import bfs_parents, path_from_parents
+from graph import get_shared_graph
+from utils import word_sources
+
+# Graph used by pool workers, with the (word file, max length) it was loaded for.
+# Loaded before the pool starts so forked workers share its (memory-mapped)
+# pages read-only instead of building their own.
+_worker_graph = None
+_worker_key = None
+
+def _init_worker(word_file, max_length):
+    global _worker_graph, _worker_key
+    key = (word_sources(word_file), max_length)
+    if _worker_key != key:
+        _worker_graph = get_shared_graph(word_file, compact=True, max_length=max_length)
+        _worker_key = key
+
+def read_pairs(lines):
+    """Parse (start, target) pairs from text lines, skipping blanks and # comments"""
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("{"):
+            record = json.loads(line)
+            yield record["start"].lower(), record["target"].lower()
+        else:
+            start, target = line.split()[:2]
+            yield start.lower(), target.lower()
+
+def group_by_source(pairs):
+    """Group targets by their start word, so each start needs a single BFS"""
+    groups = defaultdict(list)
+    for start, target in pairs:
+        groups[start].append(target)
+    return groups
+
+def bfs_parent_ids(tree, source_id, target_ids):
+    """BFS over a CSRWordTree's integer IDs, returns parent IDs (-1 when unreached)
+
+    Works on the offset and neighbor arrays directly, so no neighbor word
+    tuples are built while searching.
+    """
+    offsets, neighbors = tree.offsets, tree.neighbors
+    parents = array("i", [-1]) * len(tree.words)
+    parents[source_id] = source_id
+    remaining = set(target_ids) - {source_id}
+    queue = [source_id]
+    for current_id in queue:  # The list grows while we walk it
+        if not remaining:
+            break
+        for neighbor_id in neighbors[offsets[current_id]:offsets[current_id + 1]]:
+            if parents[neighbor_id] < 0:
+                parents[neighbor_id] = current_id
+                queue.append(neighbor_id)
+                remaining.discard(neighbor_id)
+    return parents
+
+def _path_from_parent_ids(tree, parents, source_id, target_id):
+    if target_id is None or parents[target_id] < 0:
+        return []
+    path = [target_id]
+    while path[-1] != source_id:
+        path.append(parents[path[-1]])
+    return [tree.words[word_id] for word_id in reversed(path)]
+
+def solve_source(graph, source, targets):
+    """Shortest ladders from one source to each of its targets, with one BFS"""
+    components = graph.components
+    reachable = [target for target in targets if components.connected(source, target)]
+    if graph.compact and reachable:
+        tree = graph.word_tree
+        source_id = tree.word_id(source)
+        parents = bfs_parent_ids(tree, source_id, [tree.word_id(target) for target in reachable])
+        ladder_to = lambda target: _path_from_parent_ids(tree, parents, source_id, tree.word_id(target))
+    else:
+        parents = bfs_parents(graph.word_tree, source, reachable) if reachable else {}
+        ladder_to = lambda target: path_from_parents(parents, target)
+    results = []
+    for target in targets:
+        path = ladder_to(target)
+        results.append({
+            "start": source,
+            "target": target,
+            "distance": len(path) - 1 if path else None,
+            "path": path
+        })
+    return results
+
+def _solve_group(group):
+    source, targets = group
+    return solve_source(_worker_graph, source, targets)
+
+def solve_pairs(pairs, word_file='wordslist.txt', processes=None, max_length=6, chunksize=16):
+    """Yield a result dict per pair, solving source groups across a process pool
+
+    Results are yielded as groups finish, so their order differs from the
+    input. With processes=1 everything runs in the calling process.
+    """
+    _init_worker(word_file, max_length)
+    groups = list(group_by_source(pairs).items())
+    if processes == 1:
+        for group in groups:
+            yield from _solve_group(group)
+        return
+
+    with multiprocessing.Pool(processes, initializer=_init_worker, initargs=(word_file, max_length)) as pool:
+        for results in pool.imap_unordered(_solve_group, groups, chunksize):
+            yield from results
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve many word ladder pairs at once")
+    parser.add_argument("pairs", help="pairs file, '-' for stdin")
+    parser.add_argument("--output", default="-", help="JSONL output file, '-' for stdout")
+    parser.add_argument("--words", default="wordslist.txt", help="word list file")
+    parser.add_argument("--max-length", type=int, default=6, help="longest word to load")
+    parser.add_argument("--processes", type=int, default=None, help="worker processes (default: all cores)")
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    if args.pairs == "-":
+        pairs = list(read_pairs(sys.stdin))
+    else:
+        with open(args.pairs) as file:
+            pairs = list(read_pairs(file))
+
+    output = sys.stdout if args.output == "-" else open(args.output, "w")
+    solved = 0
+    try:
+        for result in solve_pairs(pairs, args.words, args.processes, args.max_length):
+            output.write(json.dumps(result) + "\n")
+            solved += 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    elapsed = time.perf_counter() - start_time
+    print(f"{solved} pairs in {elapsed:.2f} sec ({solved / max(elapsed, 1e-9):.0f} pairs/sec)", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# benchmarks - Contains the benchmark scripts (run from the repo root with python -m)
@@ -0,0 +1,51 @@
+# bench_build_tree.py - Compares the probe, wildcard-bucket and vectorized (numpy) graph builders
+#
+# Usage: python -m benchmarks.bench_build_tree [--words wordslist.txt] [--repeat 3]
+
+import argparse
+import time
+
+from graph import build_word_tree, build_word_tree_probe, have_numpy
+from utils import load_words
+
+def time_builder(builder, words, repeat):
+    """Return the best wall time of `repeat` runs and the last tree built"""
+    best = float("inf")
+    tree = None
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        tree = builder(words)
+        best = min(best, time.perf_counter() - start_time)
+    return best, tree
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the word graph builders")
+    parser.add_argument("--words", default="wordslist.txt", help="word list file")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per builder")
+    args = parser.parse_args()
+
+    words = load_words(args.words)
+    probe_time, probe_tree = time_builder(build_word_tree_probe, words, args.repeat)
+    bucket_time, bucket_tree = time_builder(lambda words: build_word_tree(words, vectorized=False),
+                                            words, args.repeat)
+
+    edges = sum(len(neighbors) for neighbors in bucket_tree.values())
+    print(f"words: {len(words)}  words with neighbors: {len(bucket_tree)}  edges: {edges}")
+    print(f"probe builder:  {probe_time:.3f} sec")
+    print(f"bucket builder: {bucket_time:.3f} sec ({probe_time / bucket_time:.1f}x faster)")
+
+    # Every builder must produce the same adjacency, neighbor order included
+    if dict(probe_tree) != dict(bucket_tree):
+        raise SystemExit("MISMATCH: bucket builder output differs from the probe builder")
+    if have_numpy():
+        vectorized_time, vectorized_tree = time_builder(lambda words: build_word_tree(words, vectorized=True),
+                                                        words, args.repeat)
+        print(f"vectorized builder: {vectorized_time:.3f} sec ({probe_time / vectorized_time:.1f}x faster)")
+        if dict(probe_tree) != dict(vectorized_tree):
+            raise SystemExit("MISMATCH: vectorized builder output differs from the probe builder")
+    else:
+        print("vectorized builder: skipped, numpy is not installed")
+    print("outputs match")
+
+if __name__ == "__main__":
+    main()
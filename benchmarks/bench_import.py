@@ -0,0 +1,64 @@
+# bench_import.py - Measures the import time of the headless core modules
+#
+# Usage: python -m benchmarks.bench_import [--repeat 5] [--budget-ms 100]
+#
+# Each module is imported in a fresh interpreter with -X importtime. Exits
+# with status 1 when a core module pulls in a plotting or UI library, or
+# when word_ladder takes longer than the budget to import.
+
+import argparse
+import subprocess
+import sys
+
+# Modules batch jobs and search workers import, none of them may draw
+CORE_MODULES = ["utils", "graph", "algorithms", "search_service", "word_ladder", "batch_solver"]
+
+# Libraries that belong to the UI layer only (visualization.py, main.py). networkx
+# used to lay out the path figure and is no longer needed at all, it must stay out too
+UI_LIBRARIES = ["plotly", "streamlit", "networkx"]
+
+def import_time(module):
+    """Cumulative import time of `module` in microseconds, and the top-level modules it loaded"""
+    code = (f"import sys, {module}; "
+            f"print(' '.join(sorted({{name.partition('.')[0] for name in sys.modules}})))")
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            capture_output=True, text=True, check=True)
+    microseconds = None
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            microseconds = int(fields[1])
+    return microseconds, set(result.stdout.split())
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the import time of the core modules")
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per module")
+    parser.add_argument("--budget-ms", type=float, default=100.0,
+                        help="maximum import time of word_ladder in milliseconds")
+    args = parser.parse_args()
+
+    failures = []
+    for module in CORE_MODULES:
+        timings = []
+        for _ in range(args.repeat):
+            microseconds, loaded = import_time(module)
+            timings.append(microseconds)
+        best_ms = min(timings) / 1000
+        ui_loaded = [library for library in UI_LIBRARIES if library in loaded]
+        print(f"{module:15} {best_ms:8.1f} ms  {len(loaded):4} modules loaded"
+              + (f"  UI: {', '.join(ui_loaded)}" if ui_loaded else ""))
+        if ui_loaded:
+            failures.append(f"{module} imports {', '.join(ui_loaded)}")
+        if module == "word_ladder" and best_ms > args.budget_ms:
+            failures.append(f"word_ladder takes {best_ms:.1f} ms to import, budget {args.budget_ms:.0f} ms")
+
+    if failures:
+        print("FAILED:")
+        for line in failures:
+            print(f"  {line}")
+        sys.exit(1)
+    print("core modules import without the UI libraries")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# bench_landmarks.py - Compares A* and GBFS with the Hamming and max(Hamming, ALT) heuristics
+#
+# Usage: python -m benchmarks.bench_landmarks [--pairs 200] [--seed 0]
+
+import argparse
+import random
+import time
+
+from algorithms import a_star_search, gbfs_search
+from graph import get_shared_graph
+
+def sample_pairs(graph, count, seed):
+    """Reachable pairs of every word length"""
+    rng = random.Random(seed)
+    words = sorted(graph.word_tree)
+    pairs = []
+    while len(pairs) < count:
+        start = rng.choice(words)
+        target = rng.choice(graph.components.component_of(start))
+        if target != start:
+            pairs.append((start, target))
+    return pairs
+
+def run(search, word_tree, pairs, heuristic):
+    """Nodes explored, max queue size, wall time and path lengths over all pairs"""
+    nodes = queue = 0
+    lengths = []
+    start_time = time.perf_counter()
+    for start, target in pairs:
+        path, stats = search(word_tree, start, target, record_costs=False, heuristic=heuristic)
+        nodes += stats["nodes_explored"]
+        queue += stats["max_queue_size"]
+        lengths.append(len(path))
+    return nodes, queue, time.perf_counter() - start_time, lengths
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the landmark heuristic")
+    parser.add_argument("--pairs", type=int, default=200, help="number of start/target pairs")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for the pairs")
+    args = parser.parse_args()
+
+    graph = get_shared_graph()
+    start_time = time.perf_counter()
+    landmarks = graph.landmark_index()
+    print(f"landmark index ready in {time.perf_counter() - start_time:.3f} sec")
+    pairs = sample_pairs(graph, args.pairs, args.seed)
+
+    for name, search in (("A*", a_star_search), ("GBFS", gbfs_search)):
+        hamming = run(search, graph.word_tree, pairs, None)
+        alt = run(search, graph.word_tree, pairs, landmarks.heuristic)
+        # Both heuristics are admissible, so A* must still find shortest ladders
+        if name == "A*" and hamming[3] != alt[3]:
+            raise SystemExit("MISMATCH: A* path lengths differ between heuristics")
+        print(f"{name:5} Hamming: {hamming[0]:8} nodes, {hamming[1]:8} queue, {hamming[2]:.3f} sec, "
+              f"{sum(hamming[3]) - len(pairs)} moves")
+        print(f"{name:5} ALT:     {alt[0]:8} nodes, {alt[1]:8} queue, {alt[2]:.3f} sec, "
+              f"{sum(alt[3]) - len(pairs)} moves ({hamming[0] / max(alt[0], 1):.1f}x fewer nodes)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# bench_load_words.py - Times word loading on its own, separately from graph building
+#
+# Usage: python -m benchmarks.bench_load_words [--words wordslist.txt] [--repeat 5]
+
+import argparse
+import gzip
+import os
+import shutil
+import tempfile
+import time
+
+from graph import build_word_tree, load_word_tree
+from utils import load_words
+
+def load_words_legacy(filename):
+    """The original loader: strip() up to three times per line, fixed 3-6 letters"""
+    with open(filename, 'r') as file:
+        return {word.strip().lower() for word in file
+                if 3 <= len(word.strip()) <= 6 and word.strip().isalpha()}
+
+def best_time(function, repeat):
+    """Best wall time of `repeat` calls and the last result"""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start_time)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the word loaders")
+    parser.add_argument("--words", default="wordslist.txt", help="word list file")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        gzip_file = os.path.join(directory, "words.txt.gz")
+        with open(args.words, "rb") as source, gzip.open(gzip_file, "wb") as target:
+            shutil.copyfileobj(source, target)
+
+        legacy_time, legacy_words = best_time(lambda: load_words_legacy(args.words), args.repeat)
+        plain_time, plain_words = best_time(lambda: load_words(args.words), args.repeat)
+        gzip_time, gzip_words = best_time(lambda: load_words(gzip_file), args.repeat)
+    if not legacy_words == plain_words == gzip_words:
+        raise SystemExit("MISMATCH: loaders returned different words")
+
+    separate_time, _ = best_time(lambda: build_word_tree(load_words(args.words)), args.repeat)
+    streaming_time, _ = best_time(lambda: load_word_tree(args.words), args.repeat)
+
+    print(f"{len(plain_words)} words")
+    print(f"legacy load_words:        {legacy_time * 1000:.1f} ms")
+    print(f"streaming load (plain):   {plain_time * 1000:.1f} ms")
+    print(f"streaming load (gzip):    {gzip_time * 1000:.1f} ms")
+    print(f"load, then build:         {separate_time * 1000:.1f} ms")
+    print(f"streaming load and build: {streaming_time * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
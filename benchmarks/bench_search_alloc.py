@@ -0,0 +1,77 @@
+# bench_search_alloc.py - Measures search allocations and time with and without cost recording
+#
+# Usage: python -m benchmarks.bench_search_alloc [--pairs 100] [--seed 0]
+
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+
+from algorithms import SEARCH_ALGORITHMS
+from graph import get_shared_graph
+from node import Node
+
+class DictNode:
+    """Node without __slots__, the layout searches used before"""
+    def __init__(self, word, parent=None, path_cost=0, heuristic_cost=0):
+        self.word = word
+        self.parent = parent
+        self.path_cost = path_cost
+        self.heuristic_cost = heuristic_cost
+        self.total_cost = path_cost + heuristic_cost
+
+def sample_pairs(graph, count, seed):
+    """Reachable 5- and 6-letter pairs, the expensive searches in Hard mode"""
+    rng = random.Random(seed)
+    words = sorted(word for word in graph.word_tree if len(word) >= 5)
+    pairs = []
+    while len(pairs) < count:
+        start = rng.choice(words)
+        target = rng.choice(graph.components.component_of(start))
+        if target != start:
+            pairs.append((start, target))
+    return pairs
+
+def measure(search, word_tree, pairs, record_costs):
+    """Total time and peak traced memory for one search per pair, plus the paths found"""
+    tracemalloc.start()
+    paths = []
+    peak = 0
+    for start, target in pairs:
+        tracemalloc.reset_peak()
+        paths.append(search(word_tree, start, target, record_costs=record_costs)[0])
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+
+    # Timing without tracemalloc, which slows allocation down
+    start_time = time.perf_counter()
+    for start, target in pairs:
+        search(word_tree, start, target, record_costs=record_costs)
+    return time.perf_counter() - start_time, peak, paths
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark search allocations")
+    parser.add_argument("--pairs", type=int, default=100, help="number of start/target pairs")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for the pairs")
+    args = parser.parse_args()
+
+    graph = get_shared_graph()
+    pairs = sample_pairs(graph, args.pairs, args.seed)
+
+    node = Node("word")
+    dict_node = DictNode("word")
+    print(f"Node size: {sys.getsizeof(node)} bytes slotted, "
+          f"{sys.getsizeof(dict_node) + sys.getsizeof(dict_node.__dict__)} bytes with __dict__")
+
+    for name, search in SEARCH_ALGORITHMS.items():
+        full_time, full_peak, full_paths = measure(search, graph.word_tree, pairs, True)
+        lean_time, lean_peak, lean_paths = measure(search, graph.word_tree, pairs, False)
+        if full_paths != lean_paths:
+            raise SystemExit(f"MISMATCH: {name} paths differ without cost recording")
+        print(f"{name:18} costs recorded: {full_time:.3f} sec, peak {full_peak / 1024:.0f} KiB | "
+              f"costs skipped: {lean_time:.3f} sec, peak {lean_peak / 1024:.0f} KiB "
+              f"(speedup {full_time / lean_time:.2f}x)")
+
+if __name__ == "__main__":
+    main()
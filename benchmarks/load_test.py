@@ -0,0 +1,310 @@
+# load_test.py - Simulates concurrent players against the WordLadderGame API, without Streamlit
+#
+# Usage: python -m benchmarks.load_test [--players 8] [--duration 30] [--processes 0]
+#                                       [--hint-rate 0.3] [--async-hints] [--output load.json]
+#
+# Every player is a thread with its own game (one session), playing games
+# back to back until the time is up: new game, a mix of hints and moves,
+# then scoring, the same calls main.py makes. With --processes the players
+# are spread over that many worker processes instead of this one. Reports
+# requests/sec and p50/p95/p99 latency per operation, and RSS over time.
+
+import argparse
+from collections import defaultdict
+import json
+import multiprocessing
+import os
+import random
+import threading
+import time
+
+from algorithms import SEARCH_ALGORITHMS
+from instrumentation import LatencyHistogram
+from word_ladder import DISTANCE_MAP, HINT_TIME_LIMIT, WordLadderGame
+
+DIFFICULTIES = ["Easy", "Medium", "Hard"]
+ALGORITHMS = [*SEARCH_ALGORITHMS, DISTANCE_MAP]
+OPERATIONS = ["new_game", "hint", "move", "score"]
+
+def rss_bytes(pid="self"):
+    """Resident set size of a process from /proc, None where that is not available"""
+    try:
+        with open(f"/proc/{pid}/status") as file:
+            for line in file:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+class PlayerStats:
+    """Latency histograms per operation and game outcomes of one or more players"""
+    def __init__(self):
+        self.latency = defaultdict(LatencyHistogram)  # operation -> histogram
+        self.games = 0
+        self.abandoned = 0  # Games cut off by the end of the run
+        self.gave_up = 0  # Games that ran out of moves
+        self.hints = 0
+        self.moves = 0
+        self.score_total = 0
+
+    def timed(self, operation, function, *args, **kwargs):
+        started = time.perf_counter_ns()
+        result = function(*args, **kwargs)
+        self.latency[operation].record(time.perf_counter_ns() - started)
+        return result
+
+    def merge(self, other):
+        for operation, histogram in other.latency.items():
+            self.latency[operation].merge(histogram)
+        for name in ("games", "abandoned", "gave_up", "hints", "moves", "score_total"):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+def choose_move(game, rng, current, target, skill):
+    """The next word: an optimal move with probability `skill`, otherwise any valid move"""
+    moves = game.word_tree.get(current, ())
+    if not moves:
+        return None
+    if rng.random() < skill:
+        best = game.optimal_moves(current, target)
+        if best:
+            return rng.choice(best)
+    return rng.choice(moves)
+
+def play_game(game, rng, stats, deadline, args):
+    """One game the way main.py drives it, returns False if the run ended first"""
+    difficulty = rng.choice(args.difficulties)
+    algorithm = rng.choice(args.algorithms)
+    start, target, optimal_distance = stats.timed("new_game", game.new_game, difficulty)
+    if not start or not target:
+        return True
+    path = [start]
+    hints = 0
+    # Players who wander too far give up, like real ones do
+    max_moves = 3 * (optimal_distance or 5) + 5
+    while path[-1] != target:
+        if time.monotonic() > deadline:
+            stats.abandoned += 1
+            return False
+        current = path[-1]
+        hint = None
+        if rng.random() < args.hint_rate:
+            if args.async_hints:
+                # Submitted to the shared search service, timed until the answer is back
+                hint, _ = stats.timed("hint", lambda: game.submit_hint(current, target, algorithm,
+                                                                       time_limit=HINT_TIME_LIMIT).result())
+            else:
+                hint, _ = stats.timed("hint", game.get_hint, current, target, algorithm,
+                                      time_limit=HINT_TIME_LIMIT)
+            hints += 1
+        if hint is not None and hint in game.word_tree.get(current, ()) and rng.random() < args.follow_hints:
+            word = hint
+        else:
+            word = stats.timed("move", choose_move, game, rng, current, target, args.skill)
+        if word is None or len(path) > max_moves:
+            stats.gave_up += 1
+            break
+        path.append(word)
+        stats.moves += 1
+        if args.think_time:
+            time.sleep(rng.uniform(0, 2 * args.think_time))
+
+    if path[-1] == target:
+        def score():
+            optimal_path, _ = game.find_path(start, target, "Bidirectional BFS")
+            game.shortest_paths(start, target).is_shortest_path(path)
+            return game.calculate_player_score(path, optimal_path, hints)
+        stats.score_total += stats.timed("score", score)
+    stats.games += 1
+    stats.hints += hints
+    return True
+
+def run_player(player_id, deadline, args, stats, lock):
+    rng = random.Random(args.seed * 100003 + player_id)
+    game = WordLadderGame(args.words)
+    player_stats = PlayerStats()
+    while time.monotonic() < deadline and play_game(game, rng, player_stats, deadline, args):
+        pass
+    with lock:
+        stats.merge(player_stats)
+
+def run_players(player_ids, duration, args):
+    """Run players on threads of this process, returns their merged PlayerStats and cache stats"""
+    stats = PlayerStats()
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+    threads = [threading.Thread(target=run_player, args=(player_id, deadline, args, stats, lock), daemon=True)
+               for player_id in player_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return stats, WordLadderGame(args.words).search_cache_stats()
+
+def _process_worker(player_ids, duration, args, ready, start, results, finish):
+    warm_up(args)
+    ready.put(os.getpid())
+    start.wait()
+    results.put(run_players(player_ids, duration, args))
+    # Stay alive until the last RSS sample has been taken
+    finish.wait()
+
+def warm_up(args):
+    """Build every word length and the distance strata before the clock starts"""
+    if args.cold:
+        return
+    graph = WordLadderGame(args.words).graph
+    if graph.lazy:
+        graph.word_tree.build_lengths()
+    graph.distance_strata(wait=True)
+
+class RSSSampler(threading.Thread):
+    """Samples the summed RSS of this process and the worker processes at a fixed interval"""
+    def __init__(self, interval, pids=()):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.pids = ["self", *pids]
+        self.samples = []  # (seconds since start, bytes)
+        self._stop_event = threading.Event()
+        self._start_time = time.monotonic()
+
+    def sample(self):
+        values = [rss_bytes(pid) for pid in self.pids]
+        if any(value is not None for value in values):
+            self.samples.append((round(time.monotonic() - self._start_time, 3),
+                                 sum(value for value in values if value is not None)))
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.sample()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        self.sample()
+
+def run_load_test(args):
+    """Run the simulated players and return the report as a JSON-ready dict"""
+    player_ids = list(range(args.players))
+    if args.processes:
+        context = multiprocessing.get_context()
+        ready, results = context.Queue(), context.Queue()
+        start, finish = context.Event(), context.Event()
+        groups = [player_ids[i::args.processes] for i in range(args.processes)]
+        workers = [context.Process(target=_process_worker,
+                                   args=(group, args.duration, args, ready, start, results, finish),
+                                   daemon=True)
+                   for group in groups if group]
+        for worker in workers:
+            worker.start()
+        pids = [ready.get() for _ in workers]
+        sampler = RSSSampler(args.sample_interval, pids)
+        sampler.sample()
+        sampler.start()
+        started = time.perf_counter()
+        start.set()
+        stats = PlayerStats()
+        cache = defaultdict(int)
+        for _ in workers:
+            worker_stats, worker_cache = results.get()
+            stats.merge(worker_stats)
+            for key in ("hits", "misses"):
+                cache[key] += worker_cache[key]
+        elapsed = time.perf_counter() - started
+        sampler.stop()
+        finish.set()
+        for worker in workers:
+            worker.join()
+    else:
+        warm_up(args)
+        sampler = RSSSampler(args.sample_interval)
+        sampler.sample()
+        sampler.start()
+        started = time.perf_counter()
+        stats, cache = run_players(player_ids, args.duration, args)
+        elapsed = time.perf_counter() - started
+        sampler.stop()
+
+    lookups = cache["hits"] + cache["misses"]
+    operations = {}
+    for operation in OPERATIONS:
+        summary = stats.latency[operation].summary()
+        summary["per_sec"] = summary["count"] / elapsed
+        operations[operation] = summary
+    rss = [value for _, value in sampler.samples]
+    return {
+        "config": {name: value for name, value in vars(args).items() if name != "output"},
+        "seconds": elapsed,
+        "requests": sum(summary["count"] for summary in operations.values()),
+        "requests_per_sec": sum(summary["count"] for summary in operations.values()) / elapsed,
+        "operations": operations,
+        "games": {
+            "completed": stats.games,
+            "abandoned": stats.abandoned,
+            "gave_up": stats.gave_up,
+            "hints": stats.hints,
+            "moves": stats.moves,
+            "mean_score": stats.score_total / max(stats.games - stats.gave_up, 1)
+        },
+        "search_cache": {"hits": cache["hits"], "misses": cache["misses"],
+                         "hit_rate": cache["hits"] / lookups if lookups else 0.0},
+        "rss": {
+            "start_bytes": rss[0] if rss else None,
+            "peak_bytes": max(rss) if rss else None,
+            "end_bytes": rss[-1] if rss else None,
+            "samples": sampler.samples
+        }
+    }
+
+def print_report(report):
+    config = report["config"]
+    where = f"{config['processes']} processes" if config["processes"] else "threads"
+    print(f"{config['players']} players on {where}, {report['seconds']:.1f} sec: "
+          f"{report['requests']} requests ({report['requests_per_sec']:.1f}/sec)")
+    print(f"{'operation':9} {'count':>7} {'per sec':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for operation, summary in report["operations"].items():
+        print(f"{operation:9} {summary['count']:7} {summary['per_sec']:8.1f} {summary['p50_ms']:8.2f} "
+              f"{summary['p95_ms']:8.2f} {summary['p99_ms']:8.2f} {summary['max_ms']:8.2f}")
+    games = report["games"]
+    print(f"games: {games['completed']} completed ({games['gave_up']} given up, {games['abandoned']} cut off), "
+          f"{games['hints']} hints, {games['moves']} moves, mean score {games['mean_score']:.1f}")
+    print(f"search cache: {report['search_cache']['hit_rate']:.0%} hit rate")
+    rss = report["rss"]
+    if rss["samples"]:
+        print(f"RSS: start {rss['start_bytes'] / 2**20:.1f} MiB, peak {rss['peak_bytes'] / 2**20:.1f} MiB, "
+              f"end {rss['end_bytes'] / 2**20:.1f} MiB ({len(rss['samples'])} samples)")
+    else:
+        print("RSS: not available on this platform")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the game API with simulated players")
+    parser.add_argument("--words", default="wordslist.txt", help="word list file")
+    parser.add_argument("--players", type=int, default=8, help="concurrent simulated players")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to run")
+    parser.add_argument("--processes", type=int, default=0,
+                        help="spread the players over this many worker processes (0: threads here)")
+    parser.add_argument("--difficulties", nargs="+", default=DIFFICULTIES, choices=DIFFICULTIES)
+    parser.add_argument("--algorithms", nargs="+", default=ALGORITHMS, choices=ALGORITHMS,
+                        help="hint algorithms, one is picked per game")
+    parser.add_argument("--hint-rate", type=float, default=0.3, help="chance of asking for a hint before a move")
+    parser.add_argument("--follow-hints", type=float, default=0.8, help="chance of taking the hinted move")
+    parser.add_argument("--skill", type=float, default=0.6, help="chance of an optimal move without a hint")
+    parser.add_argument("--think-time", type=float, default=0.0, help="mean seconds between moves")
+    parser.add_argument("--async-hints", action="store_true", help="ask for hints through the search service")
+    parser.add_argument("--cold", action="store_true", help="start without building the graph and strata first")
+    parser.add_argument("--sample-interval", type=float, default=0.5, help="seconds between RSS samples")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the players' choices")
+    parser.add_argument("--output", help="also write the report to this JSON file")
+    args = parser.parse_args()
+    if args.players < 1:
+        parser.error("--players must be at least 1")
+
+    report = run_load_test(args)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"report written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+# suite.py - Contains the reproducible benchmark suite for the graph build and the searches
+#
+# Usage: python -m benchmarks.suite [--words wordslist.txt] [--output benchmarks/results.json]
+#                                   [--baseline benchmarks/baseline.json] [--update-baseline] [--strict]
+#
+# Runs offline on the word file alone (the graph cache is not used). Exits
+# with status 1 when a search explored more nodes than in the baseline.
+# Time and memory changes are only reported, unless --strict is given.
+
+import argparse
+from functools import partial
+import hashlib
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from algorithms import a_star_search, bfs_search, gbfs_search, ucs_search
+from frontier import BucketFrontier
+from graph import build_word_tree
+from strata import DistanceStrata
+from utils import load_words
+
+SUITE_VERSION = 1
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUTPUT = os.path.join(BENCHMARK_DIR, "results.json")
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, "baseline.json")
+
+# Searches with their default (Hamming) heuristic, so runs are comparable across changes
+SEARCHES = {
+    "BFS": bfs_search,
+    "UCS": ucs_search,
+    "GBFS": gbfs_search,
+    "A*": a_star_search,
+    # Same searches on the deduplicated bucket queue, see frontier.py
+    "UCS/bucket": partial(ucs_search, frontier=BucketFrontier),
+    "GBFS/bucket": partial(gbfs_search, frontier=BucketFrontier),
+    "A*/bucket": partial(a_star_search, frontier=BucketFrontier)
+}
+
+# Strata of the pair corpus by optimal ladder length, the last one is open ended
+DISTANCE_BANDS = [(1, 2), (3, 4), (5, 6), (7, 10), (11, None)]
+
+# Allowed slowdown per kind of metric before it counts as a regression.
+# Timings are only comparable on the machine that recorded the baseline;
+# nodes explored are deterministic, so any increase is a regression.
+TOLERANCES = {"time": 0.25, "memory": 0.10, "nodes": 0.0}
+# Kinds of metric that fail the run; the noisy ones are advisory unless --strict
+FAILING_KINDS = {"nodes"}
+
+def percentile(sorted_values, percent):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * percent // 100))
+    return sorted_values[int(rank) - 1]
+
+def best_time(function, repeat):
+    """Best wall time of `repeat` calls, and the last result"""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start_time)
+    return best, result
+
+def peak_memory(function):
+    """Peak bytes traced while running `function` once"""
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def build_corpus(word_tree, seed, pairs_per_stratum):
+    """Fixed (start, target, distance) pairs, stratified by word length and distance band
+
+    Drawn from the distance strata with a fixed seed, so the corpus only
+    changes when the word file does.
+    """
+    strata = DistanceStrata.build(word_tree, seed=seed)
+    rng = random.Random(seed)
+    corpus = []
+    for length in sorted(strata.pairs):
+        for shortest, longest in DISTANCE_BANDS:
+            band = sorted((start, target, distance)
+                          for distance, bucket in strata.pairs[length].items()
+                          if distance >= shortest and (longest is None or distance <= longest)
+                          for start, target in bucket)
+            corpus.extend(rng.sample(band, min(pairs_per_stratum, len(band))))
+    return corpus
+
+def corpus_fingerprint(corpus):
+    return hashlib.sha256(json.dumps(corpus).encode()).hexdigest()[:16]
+
+def bench_search(search, word_tree, corpus, repeat=3):
+    """Throughput, latency percentiles, nodes explored and peak memory of one search
+
+    Each pair's latency is its best of `repeat` runs, which keeps scheduler
+    noise out of the percentiles.
+    """
+    latencies = []
+    by_length = {}
+    nodes_explored = 0
+    for start, target, distance in corpus:
+        latency, (path, stats) = best_time(lambda: search(word_tree, start, target, record_costs=False),
+                                           repeat)
+        latencies.append(latency)
+        function = getattr(search, "func", search)  # Unwrap the partials
+        if len(path) - 1 != distance and function is not gbfs_search:
+            raise SystemExit(f"MISMATCH: {function.__name__} found {len(path) - 1} moves "
+                             f"for {start} -> {target}, expected {distance}")
+        nodes_explored += stats["nodes_explored"]
+        length_stats = by_length.setdefault(str(len(start)), {"latencies": [], "nodes_explored": 0})
+        length_stats["latencies"].append(latencies[-1])
+        length_stats["nodes_explored"] += stats["nodes_explored"]
+
+    # Memory traced separately, tracemalloc slows allocation down
+    def run_all():
+        for start, target, _ in corpus:
+            search(word_tree, start, target, record_costs=False)
+
+    result = _latency_summary(latencies)
+    result["nodes_explored"] = nodes_explored
+    result["peak_bytes"] = peak_memory(run_all)
+    result["by_length"] = {}
+    for length, length_stats in sorted(by_length.items()):
+        summary = _latency_summary(length_stats["latencies"])
+        summary["nodes_explored"] = length_stats["nodes_explored"]
+        result["by_length"][length] = summary
+    return result
+
+def _latency_summary(latencies):
+    latencies = sorted(latencies)
+    total = sum(latencies)
+    return {
+        "searches": len(latencies),
+        "throughput": len(latencies) / total if total else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000
+    }
+
+def run_suite(word_file, seed=0, repeat=3, pairs_per_stratum=5):
+    """Run every benchmark and return the results as a JSON-ready dict"""
+    random.seed(seed)
+    load_time, words = best_time(lambda: load_words(word_file, fallback=False), repeat)
+    build_time, word_tree = best_time(lambda: build_word_tree(words), repeat)
+    corpus = build_corpus(word_tree, seed, pairs_per_stratum)
+    results = {
+        "meta": {
+            "suite_version": SUITE_VERSION,
+            "seed": seed,
+            "words_file": os.path.basename(word_file),
+            "corpus": corpus_fingerprint(corpus),
+            "pairs": len(corpus),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S")
+        },
+        "load_words": {
+            "seconds": load_time,
+            "words": len(words),
+            "peak_bytes": peak_memory(lambda: load_words(word_file, fallback=False))
+        },
+        "build_word_tree": {
+            "seconds": build_time,
+            "edges": sum(len(neighbors) for neighbors in word_tree.values()),
+            "peak_bytes": peak_memory(lambda: build_word_tree(words))
+        },
+        "searches": {}
+    }
+    for name, search in SEARCHES.items():
+        results["searches"][name] = bench_search(search, word_tree, corpus, repeat)
+    return results
+
+def metrics(results):
+    """Flatten results into {name: (kind, value, higher_is_better)} for comparison"""
+    flat = {
+        "load_words.seconds": ("time", results["load_words"]["seconds"], False),
+        "load_words.peak_bytes": ("memory", results["load_words"]["peak_bytes"], False),
+        "build_word_tree.seconds": ("time", results["build_word_tree"]["seconds"], False),
+        "build_word_tree.peak_bytes": ("memory", results["build_word_tree"]["peak_bytes"], False)
+    }
+    for name, search in results["searches"].items():
+        flat[f"{name}.throughput"] = ("time", search["throughput"], True)
+        flat[f"{name}.p50_ms"] = ("time", search["p50_ms"], False)
+        flat[f"{name}.p99_ms"] = ("time", search["p99_ms"], False)
+        flat[f"{name}.peak_bytes"] = ("memory", search["peak_bytes"], False)
+        flat[f"{name}.nodes_explored"] = ("nodes", search["nodes_explored"], False)
+    return flat
+
+def compare(results, baseline, tolerances=TOLERANCES):
+    """Regressions of `results` against `baseline`, as (kind, readable line) pairs"""
+    if baseline["meta"]["corpus"] != results["meta"]["corpus"]:
+        raise SystemExit("Baseline was recorded on a different word file or corpus, "
+                         "rerun with --update-baseline")
+    regressions = []
+    current = metrics(results)
+    for name, (kind, old, higher_is_better) in metrics(baseline).items():
+        if name not in current or not old:
+            continue
+        new = current[name][1]
+        change = (old - new) / old if higher_is_better else (new - old) / old
+        if change > tolerances[kind]:
+            regressions.append((kind, f"{name}: {old:.4g} -> {new:.4g} ({change:+.0%} worse, "
+                                      f"tolerance {tolerances[kind]:.0%})"))
+    return regressions
+
+def print_report(results):
+    print(f"{results['meta']['pairs']} pairs (corpus {results['meta']['corpus']}, "
+          f"seed {results['meta']['seed']})")
+    print(f"load_words:      {results['load_words']['seconds']:.3f} sec, "
+          f"peak {results['load_words']['peak_bytes'] / 2**20:.1f} MiB")
+    print(f"build_word_tree: {results['build_word_tree']['seconds']:.3f} sec, "
+          f"peak {results['build_word_tree']['peak_bytes'] / 2**20:.1f} MiB")
+    for name, search in results["searches"].items():
+        print(f"{name:11} {search['throughput']:8.1f} searches/sec  p50 {search['p50_ms']:7.2f} ms  "
+              f"p99 {search['p99_ms']:8.2f} ms  nodes {search['nodes_explored']:8}  "
+              f"peak {search['peak_bytes'] / 2**20:.1f} MiB")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the reproducible benchmark suite")
+    parser.add_argument("--words", default="wordslist.txt", help="word list file")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the pair corpus")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs of the load, the build and each search")
+    parser.add_argument("--pairs-per-stratum", type=int, default=5,
+                        help="pairs per (word length, distance band) stratum")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="JSON results file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="JSON baseline to compare against")
+    parser.add_argument("--time-tolerance", type=float, default=TOLERANCES["time"],
+                        help="allowed slowdown of time metrics, as a fraction")
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--strict", action="store_true",
+                        help="also fail on time and memory regressions, not only on nodes explored")
+    args = parser.parse_args()
+
+    results = run_suite(args.words, args.seed, args.repeat, args.pairs_per_stratum)
+    print_report(results)
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"results written to {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(results, file, indent=2)
+        print(f"baseline updated: {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print("no baseline to compare against, create one with --update-baseline")
+        return
+    with open(args.baseline) as file:
+        regressions = compare(results, json.load(file), dict(TOLERANCES, time=args.time_tolerance))
+    failing = [line for kind, line in regressions if args.strict or kind in FAILING_KINDS]
+    advisory = [line for kind, line in regressions if not (args.strict or kind in FAILING_KINDS)]
+    if advisory:
+        print("ADVISORY (time and memory vary between runs, --strict fails on these):")
+        for line in advisory:
+            print(f"  {line}")
+    if failing:
+        print("REGRESSIONS:")
+        for line in failing:
+            print(f"  {line}")
+        sys.exit(1)
+    print("no regressions against the baseline")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# csr_graph.py - Contains the compact, array-backed word graph
+
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+
+class CSRWordTree(Mapping):
+    """Word graph stored in CSR layout with integer word IDs
+
+    Word IDs are positions in the sorted `words` list. The neighbors of word
+    `i` are `neighbors[offsets[i]:offsets[i+1]]`. Lookups by word use binary
+    search over the sorted list, so no per-word dict entries are needed.
+
+    It behaves like the dict `word_tree`: `get(word)` returns the neighbor
+    words, so the search algorithms run on it unchanged.
+    """
+    def __init__(self, words, offsets, neighbors):
+        self.words = words  # Sorted list of words, index = word ID
+        self.offsets = offsets  # array('I') of len(words) + 1 edge offsets
+        self.neighbors = neighbors  # array('I') of neighbor word IDs
+
+    @classmethod
+    def from_word_tree(cls, word_tree):
+        """Pack a dict-of-lists word tree into CSR arrays"""
+        words = sorted(word_tree)
+        ids = {word: i for i, word in enumerate(words)}
+        offsets = array("I", [0])
+        neighbors = array("I")
+        for word in words:
+            neighbors.extend(ids[neighbor] for neighbor in word_tree[word])
+            offsets.append(len(neighbors))
+        return cls(words, offsets, neighbors)
+
+    def word_id(self, word):
+        """Return the integer ID of a word, or None if it is not in the graph"""
+        i = bisect_left(self.words, word)
+        if i < len(self.words) and self.words[i] == word:
+            return i
+        return None
+
+    def neighbor_ids(self, word_id):
+        """Return the neighbor IDs of a word ID"""
+        return self.neighbors[self.offsets[word_id]:self.offsets[word_id + 1]]
+
+    def get(self, word, default=None):
+        word_id = self.word_id(word)
+        if word_id is None:
+            return default
+        words = self.words
+        return tuple(words[i] for i in self.neighbor_ids(word_id))
+
+    def __getitem__(self, word):
+        neighbors = self.get(word)
+        if neighbors is None:
+            raise KeyError(word)
+        return neighbors
+
+    def __contains__(self, word):
+        return self.word_id(word) is not None
+
+    def __iter__(self):
+        return iter(self.words)
+
+    def __len__(self):
+        return len(self.words)
+
+    def edge_count(self):
+        """Number of directed edges in the graph"""
+        return len(self.neighbors)
@@ -0,0 +1,112 @@
+# frontier.py - Contains the priority-queue frontiers used by UCS, GBFS and A*
+
+from collections import deque
+from functools import partial
+import heapq
+
+# A frontier holds (priority, insertion order, node) entries, built by the
+# search, and hands out its push(entry) and pop() -> entry functions through
+# operations(). Ties pop in insertion order. A deduplicating frontier skips
+# a push when its word was already pushed at an equal or lower path cost,
+# and drops entries overtaken by a cheaper push when they come up; its pop()
+# returns None once only such entries were left.
+
+class HeapFrontier(list):
+    """Binary heap of entries, the default frontier
+
+    A list itself, so the searches' len() and emptiness checks stay in C,
+    and without deduplication push and pop are heapq's own functions.
+    """
+    def __init__(self, deduplicate=False):
+        super().__init__()
+        self.best_g = {} if deduplicate else None  # word -> lowest path cost pushed
+
+    def operations(self):
+        """The push(entry) and pop() functions of this frontier"""
+        if self.best_g is None:
+            # Made per search rather than stored, an attribute would be a reference cycle
+            return partial(heapq.heappush, self), partial(heapq.heappop, self)
+        return self._push, self._pop
+
+    def _push(self, entry):
+        node = entry[2]
+        if self.best_g.get(node.word, node.path_cost + 1) <= node.path_cost:
+            return
+        self.best_g[node.word] = node.path_cost
+        heapq.heappush(self, entry)
+
+    def _pop(self):
+        best_g = self.best_g
+        while self:
+            entry = heapq.heappop(self)
+            node = entry[2]
+            if node.path_cost <= best_g[node.word]:
+                return entry
+        return None
+
+    def nodes(self):
+        """The queued nodes, in no particular order"""
+        return [entry[2] for entry in self]
+
+class BucketFrontier:
+    """Dial's bucket queue for small non-negative integer priorities
+
+    One FIFO bucket per priority, so a push is O(1) and a pop only scans
+    forward from the lowest non-empty bucket. Word ladder priorities (path
+    costs and Hamming or landmark bounds) are small integers, and entries
+    pop in the same order as from HeapFrontier. Deduplicates by default.
+    """
+    def __init__(self, deduplicate=True):
+        self._buckets = []  # priority -> deque of entries
+        self._lowest = 0  # No bucket below this one holds an entry
+        self._size = 0
+        self.best_g = {} if deduplicate else None
+
+    def operations(self):
+        """The push(entry) and pop() functions of this frontier"""
+        return self._push, self._pop
+
+    def _push(self, entry):
+        priority, _, node = entry
+        best_g = self.best_g
+        if best_g is not None:
+            if best_g.get(node.word, node.path_cost + 1) <= node.path_cost:
+                return
+            best_g[node.word] = node.path_cost
+        buckets = self._buckets
+        while len(buckets) <= priority:
+            buckets.append(deque())
+        buckets[priority].append(entry)
+        if priority < self._lowest:
+            self._lowest = priority  # GBFS priorities can drop below the last pop
+        self._size += 1
+
+    def _pop(self):
+        buckets = self._buckets
+        best_g = self.best_g
+        while self._size:
+            bucket = buckets[self._lowest]
+            if not bucket:
+                self._lowest += 1
+                continue
+            entry = bucket.popleft()
+            self._size -= 1
+            node = entry[2]
+            if best_g is None or node.path_cost <= best_g[node.word]:
+                return entry
+        return None
+
+    def nodes(self):
+        """The queued nodes, in no particular order"""
+        return [entry[2] for bucket in self._buckets for entry in bucket]
+
+    def __len__(self):
+        return self._size
+
+# Frontiers by the names used in the game settings
+DEFAULT_FRONTIER = "Binary heap"
+FRONTIERS = {
+    DEFAULT_FRONTIER: HeapFrontier,
+    "Binary heap, deduplicated": partial(HeapFrontier, deduplicate=True),
+    "Bucket queue (Dial)": BucketFrontier
+}
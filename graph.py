@@ -0,0 +1,651 @@
+# graph.py - Contains the builders for the word graph
+
+from bisect import insort
+from collections import defaultdict
+from collections.abc import Mapping
+import random
+import string
+import sys
+import threading
+import time
+from types import MappingProxyType
+from csr_graph import CSRWordTree
+from landmarks import LandmarkIndex
+from search_cache import SearchCache
+from strata import DistanceStrata
+from utils import iter_words_by_length, load_words, word_filter, word_sources
+
+# Placeholder used for the changed position in a wildcard pattern ("c_t", "ca_")
+WILDCARD = "_"
+
+def have_numpy():
+    """Whether numpy imports, which makes graph builds several times faster (see word_matrix.py)
+
+    Asked on first use rather than at import time, numpy takes over 100 ms to import.
+    """
+    from word_matrix import HAVE_NUMPY
+    return HAVE_NUMPY
+
+def wildcard_patterns(word, wildcard=WILDCARD):
+    """Return the wildcard pattern of a word for every position"""
+    return [word[:i] + wildcard + word[i+1:] for i in range(len(word))]
+
+def build_bucket_index(words, wildcard=WILDCARD):
+    """Group words into buckets that share a wildcard pattern"""
+    buckets = defaultdict(list)
+    # Sorted so every bucket (and every neighbor list) comes out in a stable order
+    for word in sorted(words):
+        for pattern in wildcard_patterns(word, wildcard):
+            buckets[pattern].append(word)
+    return buckets
+
+def build_word_tree(words, wildcard=WILDCARD, vectorized=None):
+    """Build a tree of words that differ by one letter using wildcard buckets
+
+    Words in the same bucket differ only at the wildcard position, so every
+    pair inside a bucket is an edge. This works for any alphabet; the wildcard
+    character must not appear in the words themselves.
+
+    With `vectorized` (the default when numpy is installed) the buckets are
+    found by sorting uint8 word matrices instead, which builds the same
+    tree, neighbor order included; see word_matrix.py.
+    """
+    if vectorized is None:
+        vectorized = have_numpy()
+    if vectorized:
+        from word_matrix import build_word_tree_vectorized
+        try:
+            return build_word_tree_vectorized(words)
+        except (ImportError, ValueError):
+            pass  # No numpy, or more distinct letters than a uint8 matrix holds
+    return _tree_from_buckets(words, build_bucket_index(words, wildcard), wildcard)
+
+def build_word_tree_streaming(batches, wildcard=WILDCARD):
+    """Build the word tree from (length, [words]) batches while they are loaded
+
+    Buckets are filled as each batch arrives from the loader, so most of the
+    work overlaps reading the file. Returns (words, tree).
+    """
+    words = []
+    buckets = defaultdict(list)
+    for _, batch in batches:
+        words.extend(batch)
+        for word in batch:
+            for pattern in wildcard_patterns(word, wildcard):
+                buckets[pattern].append(word)
+    # Same bucket order as build_bucket_index, so the neighbor order matches too
+    for bucket in buckets.values():
+        bucket.sort()
+    return set(words), _tree_from_buckets(words, buckets, wildcard)
+
+def _tree_from_buckets(words, buckets, wildcard):
+    tree = defaultdict(list)
+    for word in words:
+        for pattern in wildcard_patterns(word, wildcard):
+            bucket = buckets[pattern]
+            if len(bucket) > 1:
+                tree[word].extend(other for other in bucket if other != word)
+    return tree
+
+def load_word_tree(word_file, min_length=3, max_length=6, alphabet=None):
+    """Stream a word file into (words, word_tree)"""
+    if have_numpy():
+        # The vectorized builder on the whole list beats overlapping bucket fills with reading
+        words = load_words(word_file, min_length, max_length, alphabet)
+        return words, build_word_tree(words)
+    try:
+        batches = iter_words_by_length(word_file, min_length, max_length, alphabet)
+        return build_word_tree_streaming(batches)
+    except FileNotFoundError:
+        # load_words warns and falls back to its small test set
+        words = load_words(word_file, min_length, max_length, alphabet)
+        return words, build_word_tree(words)
+
+def build_word_tree_probe(words, alphabet=string.ascii_lowercase):
+    """Build a tree of words by probing every one-letter mutation
+
+    This is the original builder, kept as the reference implementation for
+    the benchmarks. It only finds edges whose changed letter is in `alphabet`.
+    """
+    words = set(words)
+    tree = defaultdict(list)
+    words_by_length = defaultdict(list)
+
+    # Group words by length
+    for word in words:
+        words_by_length[len(word)].append(word)
+
+    # For each group of same-length words
+    for length, words_list in words_by_length.items():
+        for word in words_list:
+            # Try changing each position to each letter
+            for i in range(length):
+                for letter in alphabet:
+                    new_word = word[:i] + letter + word[i+1:]
+                    # Add to tree if it's a valid word and not the same word
+                    if new_word in words and new_word != word:
+                        tree[word].append(new_word)
+    return tree
+
+class WordComponents:
+    """Connected-component labels of a word graph
+
+    Two words can only be joined by a ladder if they have the same label.
+    """
+    def __init__(self, labels, members):
+        self.labels = labels  # word -> component label
+        self.members = members  # component label -> words in that component
+
+    @classmethod
+    def from_word_tree(cls, word_tree):
+        """Label every component with a BFS flood fill"""
+        labels = {}
+        members = []
+        # Sorted so labels are stable between runs
+        for word in sorted(word_tree):
+            if word in labels:
+                continue
+            label = len(members)
+            labels[word] = label
+            component = [word]
+            # The list grows while we walk it, so this visits the whole component
+            for current_word in component:
+                for neighbor in word_tree.get(current_word, []):
+                    if neighbor not in labels:
+                        labels[neighbor] = label
+                        component.append(neighbor)
+            members.append(component)
+        return cls(labels, members)
+
+    @classmethod
+    def from_labels(cls, words, labels):
+        """Rebuild components from a label per word (as stored in the graph cache)"""
+        members = [[] for _ in range(max(labels, default=-1) + 1)]
+        for word, label in zip(words, labels):
+            members[label].append(word)
+        return cls(dict(zip(words, labels)), members)
+
+    def label(self, word):
+        """Component label of a word, None if the word has no moves"""
+        return self.labels.get(word)
+
+    def connected(self, word1, word2):
+        """Whether a ladder between the two words exists"""
+        label = self.labels.get(word1)
+        return label is not None and label == self.labels.get(word2)
+
+    def component_of(self, word):
+        """All words in the same component as `word`"""
+        label = self.labels.get(word)
+        return self.members[label] if label is not None else []
+
+    def update(self, word_tree, affected_words):
+        """Relabel the components touching `affected_words` after an edit
+
+        Every component after the edit lies inside the old components of the
+        affected words (plus any new words), so only those are flood filled again.
+        """
+        stale = set(affected_words)
+        for label in {self.labels[word] for word in affected_words if word in self.labels}:
+            stale.update(self.members[label])
+            self.members[label] = []  # Labels are not reused, the slot just stays empty
+        for word in stale:
+            self.labels.pop(word, None)
+        for word in sorted(stale):
+            if word in self.labels or word not in word_tree:
+                continue
+            label = len(self.members)
+            self.labels[word] = label
+            component = [word]
+            for current_word in component:
+                for neighbor in word_tree.get(current_word, []):
+                    if neighbor not in self.labels:
+                        self.labels[neighbor] = label
+                        component.append(neighbor)
+            self.members.append(component)
+
+    def __len__(self):
+        return sum(1 for component in self.members if component)
+
+class LazyWordTree(Mapping):
+    """Word tree whose adjacency is built one word length at a time
+
+    Words only have moves to words of the same length, so each length class
+    is an independent graph. A length is built the first time one of its
+    words is looked up, then kept. Iterating over the whole tree (or taking
+    its len) builds every length.
+    """
+    def __init__(self, words):
+        self._words_by_length = defaultdict(list)
+        for word in words:
+            self._words_by_length[len(word)].append(word)
+        self._adjacency = {}  # word -> tuple of neighbors, for the built lengths
+        self._built = set()
+        self._lock = threading.Lock()
+        self.build_time = 0.0  # Seconds spent building the lengths built so far
+        # Labelled one length at a time as the lengths are built
+        self.components = LazyWordComponents(self)
+
+    def build_length(self, length):
+        """Build the adjacency and components of one word length, if not built yet"""
+        if length in self._built:
+            return
+        with self._lock:
+            if length in self._built:
+                return
+            start_time = time.perf_counter()
+            tree = build_word_tree(self._words_by_length.get(length, []))
+            self._adjacency.update((word, tuple(neighbors)) for word, neighbors in tree.items())
+            # Labelled before the length is marked built, so no reader sees it unlabelled
+            self.components.update(self, tree)
+            self.build_time += time.perf_counter() - start_time
+            self._built.add(length)
+
+    def build_lengths(self, lengths=None):
+        """Build the given lengths (default: all of them)"""
+        for length in sorted(self._words_by_length if lengths is None else lengths):
+            self.build_length(length)
+
+    def built_lengths(self):
+        """Word lengths whose adjacency has been built"""
+        return sorted(self._built)
+
+    def fully_built(self):
+        return self._built.issuperset(self._words_by_length)
+
+    def words_of_length(self, length):
+        """Sorted words of one length that have at least one move"""
+        self.build_length(length)
+        # Under the lock, other lengths may be building in the background meanwhile
+        with self._lock:
+            words = [word for word in self._adjacency if len(word) == length]
+        return sorted(words)
+
+    def get(self, word, default=None):
+        neighbors = self._adjacency.get(word)
+        if neighbors is None and len(word) not in self._built:
+            self.build_length(len(word))
+            neighbors = self._adjacency.get(word)
+        return default if neighbors is None else neighbors
+
+    def __getitem__(self, word):
+        neighbors = self.get(word)
+        if neighbors is None:
+            raise KeyError(word)
+        return neighbors
+
+    def __contains__(self, word):
+        return self.get(word) is not None
+
+    def __iter__(self):
+        self.build_lengths()
+        return iter(self._adjacency)
+
+    def __len__(self):
+        self.build_lengths()
+        return len(self._adjacency)
+
+class LazyWordComponents(WordComponents):
+    """Components of a LazyWordTree, a word's length is built before it is looked up"""
+    def __init__(self, word_tree):
+        super().__init__({}, [])
+        self._word_tree = word_tree
+
+    def label(self, word):
+        self._word_tree.build_length(len(word))
+        return super().label(word)
+
+    def connected(self, word1, word2):
+        self._word_tree.build_length(len(word1))
+        return super().connected(word1, word2)
+
+    def component_of(self, word):
+        self._word_tree.build_length(len(word))
+        return super().component_of(word)
+
+class WordGraph:
+    """Read-only word graph shared by every game in the process
+
+    Sessions only read it. add_words and remove_words edit it in place for
+    everyone, under a lock, and reset what was derived from the old edges.
+
+    With `compact=True` the adjacency is stored as a CSRWordTree (integer
+    word IDs in flat arrays) instead of a dict of tuples. A LazyWordTree
+    builds each word length the first time it is needed instead.
+
+    `min_length`, `max_length` and `alphabet` are the filters the words were
+    loaded with, add_words only accepts words that pass them.
+    """
+    def __init__(self, words, word_tree, build_time=0.0, compact=False, components=None, landmarks=None,
+                 min_length=3, max_length=6, alphabet=None):
+        self.words = frozenset(words)
+        self.min_length = min_length
+        self.max_length = max_length
+        self.alphabet = alphabet
+        self._keep_word = word_filter(min_length, max_length, alphabet)
+        if isinstance(word_tree, LazyWordTree):
+            if compact:
+                raise ValueError("Compact (CSR) graphs cannot be built lazily")
+            self._adjacency = word_tree._adjacency
+            self.word_tree = word_tree
+            components = word_tree.components
+            # Lengths building in the background update the adjacency under this lock
+            self._adjacency_lock = word_tree._lock
+        elif compact:
+            self.word_tree = (word_tree if isinstance(word_tree, CSRWordTree)
+                              else CSRWordTree.from_word_tree(word_tree))
+        else:
+            # Tuples behind a read-only view so no session can mutate the shared graph,
+            # only add_words and remove_words edit the dict underneath
+            self._adjacency = {word: tuple(neighbors) for word, neighbors in word_tree.items()}
+            self.word_tree = MappingProxyType(self._adjacency)
+            # Held while edits change the adjacency, and while it is iterated
+            self._adjacency_lock = threading.Lock()
+        # Labelled alongside the graph so unreachable pairs are rejected without a search
+        self.components = components if components is not None else WordComponents.from_word_tree(self.word_tree)
+        # Seconds spent loading words and building edges; a lazy graph adds each
+        # length's build as it happens, see total_build_time
+        self.build_time = build_time
+        self._memory_bytes = None  # Measured on first request and after edits
+        self._landmarks = landmarks  # LandmarkIndex, a function returning one, or None
+        self._landmarks_lock = threading.Lock()
+        # Search results depend only on the graph, so every session shares them
+        self.search_cache = SearchCache()
+        self._strata = None
+        self._strata_thread = None
+        self._strata_lock = threading.Lock()
+        self.version = 0  # Bumped on every edit, lets per-game caches notice changes
+        self._buckets = None  # Wildcard bucket index, built on the first edit
+        self._update_lock = threading.Lock()
+        self._word_matrices = {}  # Word length -> WordMatrix, built on first use
+        self._word_matrices_lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, word_file, compact=False, min_length=3, max_length=6, alphabet=None, lazy=False):
+        """Load a word file and build its graph
+
+        With `lazy` only the words are loaded here, see LazyWordTree.
+        """
+        start_time = time.perf_counter()
+        if lazy:
+            words = load_words(word_file, min_length, max_length, alphabet)
+            word_tree = LazyWordTree(words)
+        else:
+            words, word_tree = load_word_tree(word_file, min_length, max_length, alphabet)
+        return cls(words, word_tree, time.perf_counter() - start_time, compact,
+                   min_length=min_length, max_length=max_length, alphabet=alphabet)
+
+    @property
+    def lazy(self):
+        """Whether word lengths are built on first use"""
+        return isinstance(self.word_tree, LazyWordTree)
+
+    def warm(self, lengths=None):
+        """Build the given lengths (default: all) of a lazy graph in a background thread
+
+        Returns the thread, or None when there is nothing left to build.
+        """
+        if not self.lazy or self.word_tree.fully_built():
+            return None
+        thread = threading.Thread(target=self.word_tree.build_lengths, args=(lengths,), daemon=True)
+        thread.start()
+        return thread
+
+    def lengths(self):
+        """Word lengths present in the graph, shortest first"""
+        return sorted({len(word) for word in self.words})
+
+    def words_of_length(self, length):
+        """Sorted words of one length that have at least one move"""
+        if self.lazy:
+            return self.word_tree.words_of_length(length)
+        if self.compact:
+            return sorted(word for word in self.word_tree if len(word) == length)
+        with self._adjacency_lock:
+            words = [word for word in self._adjacency if len(word) == length]
+        return sorted(words)
+
+    def word_matrix(self, length):
+        """uint8 matrix of the words of one length that have moves (see word_matrix.py)
+
+        Built on first use and dropped by edits. Needs numpy.
+        """
+        with self._word_matrices_lock:
+            matrix = self._word_matrices.get(length)
+            if matrix is None:
+                from word_matrix import WordMatrix
+                matrix = self._word_matrices[length] = WordMatrix(self.words_of_length(length))
+            return matrix
+
+    def landmark_index(self):
+        """Landmark distances for the ALT heuristic, built on first use"""
+        with self._landmarks_lock:
+            if self._landmarks is None:
+                self._landmarks = LandmarkIndex.build(self.word_tree, self.components)
+            elif callable(self._landmarks):
+                # Deferred loader, e.g. unpacking the distances stored in the graph cache
+                self._landmarks = self._landmarks()
+            elif len(self._landmarks.landmarks) < len(self.components.members):
+                # A lazy graph built another length since, add landmarks for its components
+                self._landmarks.extend(self.word_tree, self.components)
+            return self._landmarks
+
+    def distance_strata(self, wait=False):
+        """Pairs bucketed by shortest-path distance, see strata.py
+
+        The first call starts building them in a background thread. Until the
+        build finishes this returns None, unless `wait` is set.
+        """
+        with self._strata_lock:
+            if self._strata_thread is None:
+                self._strata_thread = threading.Thread(target=self._build_strata, args=(self.version,),
+                                                       daemon=True)
+                self._strata_thread.start()
+            thread = self._strata_thread
+        if wait:
+            thread.join()
+        return self._strata
+
+    def _build_strata(self, version):
+        strata = DistanceStrata({})
+        rng = random.Random(0)
+        try:
+            # Shortest words first and published after each length, so Easy games
+            # can draw from the strata while a lazy graph is still building the rest
+            for length in self.lengths():
+                strata.add_length(self.word_tree, length, self.words_of_length(length), rng)
+                # Drop the result if the graph was edited while it was being built
+                if version != self.version:
+                    return
+                self._strata = strata
+        except Exception:
+            # Forget the failed build, so the next distance_strata call starts a new one
+            with self._strata_lock:
+                if self._strata_thread is threading.current_thread():
+                    self._strata_thread = None
+            raise
+
+    def add_words(self, words):
+        """Add words and their edges in place, returns the words that were new
+
+        Only the wildcard buckets of the new words are touched, so a small
+        diff costs milliseconds instead of a full rebuild. Words outside the
+        graph's length and alphabet filters are skipped, like the loader does.
+        """
+        self._check_editable()
+        new_words = {word.strip().lower() for word in words}
+        new_words = sorted(word for word in new_words if self._keep_word(word) and word not in self.words)
+        if not new_words:
+            return []
+        self._build_lengths_of(new_words)
+        with self._update_lock:
+            buckets = self._bucket_index()
+            affected = set(new_words)
+            for word in new_words:
+                for pattern in wildcard_patterns(word):
+                    insort(buckets[pattern], word)
+                    affected.update(buckets[pattern])
+            self.words = self.words.union(new_words)
+            self._refresh(affected)
+        return new_words
+
+    def remove_words(self, words):
+        """Remove words and their edges in place, returns the words that were removed"""
+        self._check_editable()
+        old_words = sorted({word.strip().lower() for word in words}.intersection(self.words))
+        if not old_words:
+            return []
+        self._build_lengths_of(old_words)
+        with self._update_lock:
+            buckets = self._bucket_index()
+            affected = set(old_words)
+            for word in old_words:
+                for pattern in wildcard_patterns(word):
+                    bucket = buckets[pattern]
+                    bucket.remove(word)
+                    affected.update(bucket)
+                    if not bucket:
+                        del buckets[pattern]
+            self.words = self.words.difference(old_words)
+            self._refresh(affected)
+        return old_words
+
+    def _check_editable(self):
+        if self.compact:
+            raise ValueError("Compact (CSR) graphs cannot be edited in place, rebuild the graph instead")
+
+    def _build_lengths_of(self, words):
+        # Edits only touch words of their own length, the other lengths can stay unbuilt
+        if self.lazy:
+            self.word_tree.build_lengths({len(word) for word in words})
+
+    def _bucket_index(self):
+        if self._buckets is None:
+            self._buckets = build_bucket_index(self.words)
+        return self._buckets
+
+    def _refresh(self, affected):
+        """Recompute the neighbors of edited words, then everything derived from them"""
+        updates = {}
+        for word in affected:
+            neighbors = ()
+            if word in self.words:
+                neighbors = tuple(other for pattern in wildcard_patterns(word)
+                                  for other in self._buckets.get(pattern, ()) if other != word)
+            updates[word] = neighbors
+        with self._adjacency_lock:
+            for word, neighbors in updates.items():
+                if neighbors:
+                    self._adjacency[word] = neighbors
+                else:
+                    self._adjacency.pop(word, None)
+
+        self.components.update(self.word_tree, affected)
+        self.version += 1
+        self.search_cache.clear()
+        self._memory_bytes = None
+        with self._landmarks_lock:
+            self._landmarks = None
+        with self._word_matrices_lock:
+            self._word_matrices = {}
+        with self._strata_lock:
+            self._strata = None
+            self._strata_thread = None
+
+    @property
+    def compact(self):
+        """Whether the adjacency is stored in CSR arrays"""
+        return isinstance(self.word_tree, CSRWordTree)
+
+    def edge_count(self):
+        """Number of directed edges in the graph"""
+        if self.compact:
+            return self.word_tree.edge_count()
+        # The adjacency dict directly, so a lazy graph only counts the lengths built so far.
+        # Copied under the lock, background builds and edits change it meanwhile
+        with self._adjacency_lock:
+            neighbor_lists = list(self._adjacency.values())
+        return sum(map(len, neighbor_lists))
+
+    def memory_footprint(self):
+        """Approximate bytes held by the graph (containers plus the word strings)"""
+        if self._memory_bytes is not None:
+            return self._memory_bytes
+        # A lazy graph keeps growing, so it is only measured once fully built
+        keep = not self.lazy or self.word_tree.fully_built()
+        seen = set()
+
+        def size(obj):
+            if id(obj) in seen:
+                return 0
+            seen.add(id(obj))
+            return sys.getsizeof(obj)
+
+        total = size(self.words) + sum(size(word) for word in self.words)
+        if self.compact:
+            tree = self.word_tree
+            total += size(tree.words) + size(tree.offsets) + size(tree.neighbors)
+            total += sum(size(word) for word in tree.words)
+        else:
+            with self._adjacency_lock:
+                tree = dict(self._adjacency)
+            total += size(tree)
+            for word, neighbors in tree.items():
+                total += size(word) + size(neighbors) + sum(size(neighbor) for neighbor in neighbors)
+        total += size(self.components.labels) + size(self.components.members)
+        total += sum(size(component) for component in self.components.members)
+        if keep:
+            self._memory_bytes = total
+        return total
+
+    def total_build_time(self):
+        """Seconds spent loading and building the graph, including lazily built lengths"""
+        if self.lazy:
+            return self.build_time + self.word_tree.build_time
+        return self.build_time
+
+    def stats(self):
+        """Summary of the graph size, memory footprint and build time"""
+        stats = {
+            "words": len(self.words),
+            "connected_words": len(self.word_tree) if self.compact else len(self._adjacency),
+            "edges": self.edge_count(),
+            "components": len(self.components),
+            "memory_bytes": self.memory_footprint(),
+            "build_time": self.total_build_time(),
+            "compact": self.compact,
+            "lazy": self.lazy
+        }
+        if self.lazy:
+            stats["built_lengths"] = self.word_tree.built_lengths()
+        return stats
+
+# One graph per word file for the whole process
+_shared_graphs = {}
+_shared_graphs_lock = threading.Lock()
+
+def get_shared_graph(word_file='wordslist.txt', compact=False, min_length=3, max_length=6,
+                     alphabet=None, use_cache=True, lazy=False, warm=False):
+    """Return the process-wide graph for a word file, building it on first use
+
+    With `use_cache` the graph is loaded from (or saved to) the on-disk graph
+    cache, see graph_cache.py. With `lazy` a graph that has to be built is
+    built one word length at a time on first use, and `warm` builds the rest
+    in a background thread. Lazy and eager graphs of the same file are
+    interchangeable, so the first caller decides which one is shared.
+    `word_file` may also be a list of word files, loaded as one graph.
+    """
+    word_file = word_sources(word_file)
+    key = (word_file, compact, min_length, max_length, alphabet)
+    with _shared_graphs_lock:
+        if key not in _shared_graphs:
+            if use_cache:
+                from graph_cache import load_or_build_graph  # graph_cache imports this module
+                graph = load_or_build_graph(word_file, compact, min_length, max_length, alphabet,
+                                            lazy=lazy, warm=warm)
+            else:
+                graph = WordGraph.from_file(word_file, compact, min_length, max_length, alphabet, lazy)
+                if warm:
+                    graph.warm()
+            _shared_graphs[key] = graph
+        return _shared_graphs[key]
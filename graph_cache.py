@@ -0,0 +1,242 @@
+# graph_cache.py - Contains the persistent, memory-mapped word graph cache
+#
+# Prebuild the cache at deploy time with:
+#     python graph_cache.py --words wordslist.txt
+
+import argparse
+from array import array
+import hashlib
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from csr_graph import CSRWordTree
+from graph import WordComponents, WordGraph, load_word_tree
+from landmarks import LandmarkIndex
+from utils import word_sources
+
+CACHE_VERSION = 3
+CACHE_MAGIC = b"WLGRAPH\0"
+# Written in native byte order, a mismatch means the file came from another platform
+ENDIAN_MARKER = 0x01020304
+# magic, version, endian marker, connected words, edges, word blob size, isolated blob size,
+# landmark slots per word, key
+HEADER = struct.Struct("=8sIIIIIII32s")
+# Landmark distance slot of a word whose component has fewer landmarks
+NO_LANDMARK = 0xFFFF
+DEFAULT_CACHE_DIR = os.environ.get("WORD_LADDER_CACHE_DIR", ".graph_cache")
+
+def cache_key(word_file, min_length=3, max_length=6, alphabet=None):
+    """Hash of the word file contents (of every file, for a list) and the filters used to load it"""
+    digest = hashlib.sha256()
+    for source in word_sources(word_file):
+        # Hashed per file, so moving lines from one file to the next changes the key
+        file_digest = hashlib.sha256()
+        with open(source, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                file_digest.update(chunk)
+        digest.update(file_digest.digest())
+    digest.update(f"|{min_length}|{max_length}|{alphabet or ''}|v{CACHE_VERSION}".encode())
+    return digest.digest()
+
+def _cache_prefix(word_file, min_length, max_length, alphabet):
+    """File name prefix shared by every cache of one word file (or list of files) and filter
+
+    Includes a hash of the files' absolute paths, so same-named word files in
+    different directories keep separate caches.
+    """
+    sources = word_sources(word_file)
+    name = os.path.splitext(os.path.basename(sources[0]))[0] if sources else "words"
+    if len(sources) > 1:
+        name += f"+{len(sources) - 1}"
+    location = hashlib.sha256("\n".join(sources).encode()).hexdigest()[:8]
+    prefix = f"{name}-{location}-{min_length}-{max_length}"
+    if alphabet is not None:
+        prefix += "-" + hashlib.sha256(alphabet.encode()).hexdigest()[:8]
+    return prefix
+
+def cache_path(word_file, key, min_length=3, max_length=6, alphabet=None, cache_dir=DEFAULT_CACHE_DIR):
+    """Cache file for a word file, its filters and the cache key"""
+    prefix = _cache_prefix(word_file, min_length, max_length, alphabet)
+    return os.path.join(cache_dir, f"{prefix}-{key.hex()[:16]}.v{CACHE_VERSION}.graph")
+
+def _padding(size):
+    """Bytes needed to align a section to 4 bytes"""
+    return -size % 4
+
+def save_graph(graph, path, key):
+    """Write a graph to `path` in the versioned binary cache format"""
+    tree = graph.word_tree if graph.compact else CSRWordTree.from_word_tree(graph.word_tree)
+    word_blob = "\n".join(tree.words).encode()
+    isolated_blob = "\n".join(sorted(graph.words.difference(tree.words))).encode()
+    landmarks = graph.landmark_index()
+    landmark_slots = max((len(distances) for distances in landmarks.distances.values()), default=0)
+    landmark_distances = array("H")
+    for word in tree.words:
+        distances = landmarks.distances[word]
+        landmark_distances.extend(distances)
+        landmark_distances.extend([NO_LANDMARK] * (landmark_slots - len(distances)))
+    header = HEADER.pack(CACHE_MAGIC, CACHE_VERSION, ENDIAN_MARKER, len(tree.words),
+                         len(tree.neighbors), len(word_blob), len(isolated_blob), landmark_slots, key)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # Write to a temporary file first so readers never see a partial cache
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as file:
+        file.write(header)
+        file.write(word_blob + b"\0" * _padding(len(word_blob)))
+        file.write(isolated_blob + b"\0" * _padding(len(isolated_blob)))
+        file.write(array("I", tree.offsets).tobytes())
+        file.write(array("I", tree.neighbors).tobytes())
+        file.write(array("I", (graph.components.label(word) for word in tree.words)).tobytes())
+        file.write(landmark_distances.tobytes())
+    os.replace(temp_path, path)
+
+def load_graph(path, key, compact=True, min_length=3, max_length=6, alphabet=None):
+    """Memory-map a cached graph, returns None if it is missing or stale
+
+    In compact mode the CSR arrays are views into the mapped file, so forked
+    workers share the same pages. The filters are the ones the cache was
+    keyed on, the graph keeps them for add_words.
+    """
+    start_time = time.perf_counter()
+    try:
+        with open(path, "rb") as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    if len(mapped) < HEADER.size:
+        return None
+
+    (magic, version, endian, word_count, edge_count, word_blob_size,
+     isolated_blob_size, landmark_slots, stored_key) = HEADER.unpack_from(mapped)
+    if (magic != CACHE_MAGIC or version != CACHE_VERSION or
+            endian != ENDIAN_MARKER or stored_key != key):
+        return None
+
+    position = HEADER.size
+    word_blob = mapped[position:position + word_blob_size]
+    position += word_blob_size + _padding(word_blob_size)
+    isolated_blob = mapped[position:position + isolated_blob_size]
+    position += isolated_blob_size + _padding(isolated_blob_size)
+    # Offsets, neighbors, one component label and the landmark distances per word follow
+    if len(mapped) != position + 4 * (2 * word_count + 1 + edge_count) + 2 * word_count * landmark_slots:
+        return None
+
+    view = memoryview(mapped)
+    offsets = view[position:position + 4 * (word_count + 1)].cast("I")
+    position += 4 * (word_count + 1)
+    neighbors = view[position:position + 4 * edge_count].cast("I")
+    position += 4 * edge_count
+    labels = view[position:position + 4 * word_count].cast("I")
+    position += 4 * word_count
+    landmark_distances = view[position:position + 2 * word_count * landmark_slots].cast("H")
+
+    words = word_blob.decode().split("\n") if word_count else []
+    isolated = isolated_blob.decode().split("\n") if isolated_blob_size else []
+    tree = CSRWordTree(words, offsets, neighbors)
+    if not compact:
+        tree = {word: tree[word] for word in words}
+    components = WordComponents.from_labels(words, labels)
+    # Unpacked on first use, most starts never run A* or GBFS
+    landmarks = lambda: load_landmarks(words, components, landmark_distances, landmark_slots)
+    graph = WordGraph(words + isolated, tree, compact=compact, components=components, landmarks=landmarks,
+                      min_length=min_length, max_length=max_length, alphabet=alphabet)
+    graph.build_time = time.perf_counter() - start_time
+    return graph
+
+def load_landmarks(words, components, landmark_distances, landmark_slots):
+    """Rebuild a LandmarkIndex from the per-word distance slots in the cache"""
+    landmarks = [[None] * landmark_slots for _ in components.members]
+    distances = {}
+    for i, word in enumerate(words):
+        slots = landmark_distances[i * landmark_slots:(i + 1) * landmark_slots]
+        word_distances = tuple(distance for distance in slots if distance != NO_LANDMARK)
+        distances[word] = word_distances
+        # A landmark is at distance 0 from itself
+        for slot, distance in enumerate(word_distances):
+            if distance == 0:
+                landmarks[components.label(word)][slot] = word
+    landmarks = [[word for word in chosen if word is not None] for chosen in landmarks]
+    return LandmarkIndex(landmarks, distances)
+
+def remove_stale_caches(current_path, prefix):
+    """Delete caches of the same word file and filters built from older contents
+
+    Only names that are exactly `prefix` plus a key and version suffix are
+    removed, so caches of the same file with other filters are kept.
+    """
+    cache_dir, current_name = os.path.split(current_path)
+    stale = re.compile(re.escape(prefix) + r"-[0-9a-f]{16}\.v\d+\.graph")
+    for entry in os.listdir(cache_dir or "."):
+        if stale.fullmatch(entry) and entry != current_name:
+            os.remove(os.path.join(cache_dir, entry))
+
+def load_or_build_graph(word_file, compact=False, min_length=3, max_length=6, alphabet=None,
+                        cache_dir=DEFAULT_CACHE_DIR, lazy=False, warm=False):
+    """Load a graph from the cache, building and caching it when missing or stale
+
+    On a miss with `lazy` the graph is built one length at a time on first
+    use (see LazyWordTree). It is only written to the cache once every
+    length is built, which `warm` does in a background thread.
+    """
+    try:
+        key = cache_key(word_file, min_length, max_length, alphabet)
+    except FileNotFoundError:
+        # Nothing to key the cache on, load_words falls back to its test words
+        graph = WordGraph.from_file(word_file, compact, min_length, max_length, alphabet, lazy)
+        if warm:
+            graph.warm()
+        return graph
+
+    prefix = _cache_prefix(word_file, min_length, max_length, alphabet)
+    path = cache_path(word_file, key, min_length, max_length, alphabet, cache_dir)
+    graph = load_graph(path, key, compact, min_length, max_length, alphabet)
+    if graph is not None:
+        return graph
+
+    if lazy and not compact:
+        graph = WordGraph.from_file(word_file, compact, min_length, max_length, alphabet, lazy)
+        if warm:
+            threading.Thread(target=_save_cache, args=(graph, path, key, prefix),
+                             daemon=True).start()
+        return graph
+
+    start_time = time.perf_counter()
+    words, word_tree = load_word_tree(word_file, min_length, max_length, alphabet)
+    graph = WordGraph(words, word_tree, time.perf_counter() - start_time, compact,
+                      min_length=min_length, max_length=max_length, alphabet=alphabet)
+    _save_cache(graph, path, key, prefix)
+    return graph
+
+def _save_cache(graph, path, key, prefix):
+    # Saving a lazy graph builds all of its lengths first
+    try:
+        save_graph(graph, path, key)
+        remove_stale_caches(path, prefix)
+    except OSError as error:
+        print(f"Could not write graph cache {path}: {error}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Prebuild the word graph cache")
+    parser.add_argument("--words", nargs="+", default=["wordslist.txt"], help="word list file(s)")
+    parser.add_argument("--min-length", type=int, default=3, help="shortest word to keep")
+    parser.add_argument("--max-length", type=int, default=6, help="longest word to keep")
+    parser.add_argument("--alphabet", default=None, help="only keep words spelled with these letters")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="directory for cache files")
+    args = parser.parse_args()
+
+    key = cache_key(args.words, args.min_length, args.max_length, args.alphabet)
+    path = cache_path(args.words, key, args.min_length, args.max_length, args.alphabet, args.cache_dir)
+    graph = load_or_build_graph(args.words, True, args.min_length, args.max_length,
+                                args.alphabet, args.cache_dir)
+    stats = graph.stats()
+    print(f"{path}: {stats['words']} words, {stats['edges']} edges, "
+          f"{os.path.getsize(path)} bytes")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+# instrumentation.py - Contains the search profiler and the per-process latency histograms
+
+from collections import defaultdict
+import math
+import threading
+from time import perf_counter_ns
+
+# Most frontier samples a profile keeps, longer searches are sampled more sparsely
+MAX_FRONTIER_POINTS = 1000
+# Histogram buckets per doubling of latency, so each bucket is about 19% wide
+BUCKETS_PER_DOUBLING = 4
+
+class SearchProfile:
+    """Per-phase timings of one search, pass one to a search as `profile=`
+
+    Push and pop times cover the frontier operations only. Expand time runs
+    from the end of a pop to the end of the expansion, so it includes the
+    pushes it made. `hook(word, frontier_size, profile)`, if given, is called
+    after every expansion, e.g. to feed an external profiler.
+    """
+    __slots__ = ("push_ns", "pushes", "pop_ns", "pops", "expand_ns", "expansions",
+                 "total_ns", "frontier", "hook", "_stride", "_popped_at")
+
+    def __init__(self, hook=None):
+        self.push_ns = 0
+        self.pushes = 0
+        self.pop_ns = 0
+        self.pops = 0
+        self.expand_ns = 0
+        self.expansions = 0
+        self.total_ns = 0
+        self.frontier = []  # (expansions so far, frontier size) samples
+        self.hook = hook
+        self._stride = 1
+        self._popped_at = perf_counter_ns()
+
+    def timed_push(self, push):
+        """Wrap a push function (heappush, deque.append, ...) so its calls are timed"""
+        def timed(*args):
+            started = perf_counter_ns()
+            push(*args)
+            self.push_ns += perf_counter_ns() - started
+            self.pushes += 1
+        return timed
+
+    def timed_pop(self, pop):
+        """Wrap a pop function (heappop, deque.popleft, ...) so its calls are timed"""
+        def timed(*args):
+            started = perf_counter_ns()
+            item = pop(*args)
+            self._popped_at = perf_counter_ns()
+            self.pop_ns += self._popped_at - started
+            self.pops += 1
+            return item
+        return timed
+
+    def expanded(self, word, frontier_size):
+        """Record the end of one expansion and the frontier size after it"""
+        self.expand_ns += perf_counter_ns() - self._popped_at
+        self.expansions += 1
+        if self.expansions % self._stride == 0:
+            self.frontier.append((self.expansions, frontier_size))
+            if len(self.frontier) >= MAX_FRONTIER_POINTS:
+                # Keep every other sample and sample half as often from now on
+                self.frontier = self.frontier[1::2]
+                self._stride *= 2
+        if self.hook is not None:
+            self.hook(word, frontier_size, self)
+        # Searches without pops (bidirectional BFS levels) time from here
+        self._popped_at = perf_counter_ns()
+
+    def summary(self):
+        """Plain dict of the timings, as stored in a search's statistics"""
+        return {
+            "push_ns": self.push_ns,
+            "pushes": self.pushes,
+            "pop_ns": self.pop_ns,
+            "pops": self.pops,
+            "expand_ns": self.expand_ns,
+            "expansions": self.expansions,
+            "total_ns": self.total_ns,
+            "frontier": list(self.frontier)
+        }
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram, cheap to update and to merge"""
+    def __init__(self):
+        self.buckets = defaultdict(int)  # bucket index -> count
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, elapsed_ns):
+        self.buckets[_bucket(elapsed_ns)] += 1
+        self.count += 1
+        self.total_ns += elapsed_ns
+        self.max_ns = max(self.max_ns, elapsed_ns)
+
+    def merge(self, other):
+        for bucket, count in other.buckets.items():
+            self.buckets[bucket] += count
+        self.count += other.count
+        self.total_ns += other.total_ns
+        self.max_ns = max(self.max_ns, other.max_ns)
+
+    def percentile(self, percent):
+        """Upper bound of the bucket holding the given percentile, in nanoseconds"""
+        if not self.count:
+            return 0
+        rank = math.ceil(self.count * percent / 100)
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(_bucket_limit(bucket), self.max_ns)
+        return self.max_ns
+
+    def summary(self):
+        """Count, mean, p50/p95/p99 and max, in milliseconds"""
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ns / self.count / 1e6 if self.count else 0.0,
+            "p50_ms": self.percentile(50) / 1e6,
+            "p95_ms": self.percentile(95) / 1e6,
+            "p99_ms": self.percentile(99) / 1e6,
+            "max_ms": self.max_ns / 1e6
+        }
+
+def _bucket(elapsed_ns):
+    return int(math.log2(max(elapsed_ns, 1)) * BUCKETS_PER_DOUBLING)
+
+def _bucket_limit(bucket):
+    return math.ceil(2 ** ((bucket + 1) / BUCKETS_PER_DOUBLING))
+
+class SearchLatency:
+    """Latency histograms of every search in the process
+
+    Keyed by (algorithm, difficulty, word length), so the summaries can be
+    read per algorithm and difficulty or per algorithm and word length.
+    """
+    def __init__(self):
+        self._histograms = defaultdict(LatencyHistogram)
+        self._lock = threading.Lock()
+
+    def record(self, algorithm, difficulty, word_length, elapsed_ns):
+        with self._lock:
+            self._histograms[(algorithm, difficulty, word_length)].record(elapsed_ns)
+
+    def summary(self, by="difficulty"):
+        """Histogram summaries keyed by (algorithm, difficulty) or (algorithm, word length)"""
+        merged = defaultdict(LatencyHistogram)
+        with self._lock:
+            for (algorithm, difficulty, word_length), histogram in self._histograms.items():
+                key = (algorithm, difficulty if by == "difficulty" else word_length)
+                merged[key].merge(histogram)
+        return {key: histogram.summary() for key, histogram in sorted(merged.items(), key=str)}
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+# Shared by every game in the process
+search_latency = SearchLatency()
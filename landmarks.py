@@ -0,0 +1,86 @@
+# landmarks.py - Contains the landmark (ALT) lower bounds used as an A* heuristic
+
+from algorithms import bfs_distances, calculate_hamming_distance
+
+# Landmarks picked per connected component
+DEFAULT_LANDMARKS = 4
+
+class LandmarkIndex:
+    """BFS distances from a few landmark words in every component
+
+    For any word x, target t and landmark l in their component, the triangle
+    inequality gives d(x, t) >= |d(l, x) - d(l, t)|. The largest of these
+    bounds (and the Hamming distance) is still admissible, and it is much
+    tighter than Hamming alone when ladders detour around missing words.
+    """
+    def __init__(self, landmarks, distances):
+        self.landmarks = landmarks  # component label -> landmark words
+        self.distances = distances  # word -> tuple of distances to its component's landmarks
+
+    @classmethod
+    def build(cls, word_tree, components, landmarks_per_component=DEFAULT_LANDMARKS, first_label=0):
+        """Pick landmarks by farthest-point selection and store their distances
+
+        Only components labelled `first_label` or later are covered.
+        """
+        landmarks = []
+        distances = {}
+        for members in components.members[first_label:]:
+            if not members:
+                landmarks.append([])  # Label emptied by an edit to the graph
+                continue
+            # Start from the word farthest from an arbitrary member, then keep
+            # adding the word farthest from every landmark chosen so far
+            from_first = bfs_distances(word_tree, members[0])
+            chosen = []
+            closest = {word: float("inf") for word in members}
+            candidate = max(members, key=from_first.__getitem__)
+            for _ in range(min(landmarks_per_component, len(members))):
+                chosen.append(candidate)
+                from_landmark = bfs_distances(word_tree, candidate)
+                for word in members:
+                    distances.setdefault(word, []).append(from_landmark[word])
+                    closest[word] = min(closest[word], from_landmark[word])
+                candidate = max(members, key=closest.__getitem__)
+                if closest[candidate] == 0:
+                    break  # Every word is already a landmark
+            landmarks.append(chosen)
+        return cls(landmarks, {word: tuple(values) for word, values in distances.items()})
+
+    def extend(self, word_tree, components, landmarks_per_component=DEFAULT_LANDMARKS):
+        """Add landmarks for the components labelled after this index was built"""
+        added = self.build(word_tree, components, landmarks_per_component, len(self.landmarks))
+        self.distances.update(added.distances)
+        self.landmarks.extend(added.landmarks)
+
+    def lower_bound(self, word, target):
+        """ALT lower bound on the moves from word to target (0 if unknown)"""
+        word_distances = self.distances.get(word)
+        target_distances = self.distances.get(target)
+        if not word_distances or not target_distances or len(word_distances) != len(target_distances):
+            return 0
+        return max(abs(a - b) for a, b in zip(word_distances, target_distances))
+
+    def heuristic(self, word, target):
+        """max(Hamming, ALT), an admissible estimate for A* and GBFS"""
+        return max(calculate_hamming_distance(word, target), self.lower_bound(word, target))
+
+    def heuristic_to(self, target, hamming_table=None):
+        """heuristic(word, target) for one fixed target, the same estimate as heuristic
+
+        The target's landmark distances are looked up once instead of per
+        call, and `hamming_table` ({word: Hamming distance to target}, see
+        WordMatrix.hamming_table) replaces the per-call Hamming count.
+        """
+        distances = self.distances
+        target_distances = distances.get(target)
+        table = hamming_table if hamming_table is not None else {}
+        def heuristic(word, _target):
+            hamming = table.get(word)
+            if hamming is None:
+                hamming = calculate_hamming_distance(word, target)
+            word_distances = distances.get(word)
+            if not word_distances or not target_distances or len(word_distances) != len(target_distances):
+                return hamming
+            return max(hamming, max(abs(a - b) for a, b in zip(word_distances, target_distances)))
+        return heuristic
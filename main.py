@@ -1,7 +1,16 @@
 # main.py - Main program for the Word Ladder Game
 import streamlit as st
 
-from word_ladder import WordLadderGame
+from frontier import FRONTIERS
+from word_ladder import HINT_TIME_LIMIT, WordLadderGame
+
+@st.fragment(run_every=0.25)
+def poll_searches():
+    """Rerun the page once a submitted search finishes, the script never waits on one"""
+    pending = [future for future in (st.session_state.hint_future, st.session_state.optimal_future)
+               if future is not None]
+    if any(future.done() for future in pending):
+        st.rerun()
 
 def main():
     """Main function for the Word Ladder Game"""
@@ -9,7 +18,7 @@ def main():
     
     st.title("Word Ladder Game")
     
-    # Initialize session state
+    # Initialize session state (the word graph itself is shared by all sessions)
     if 'game' not in st.session_state:
         st.session_state.game = WordLadderGame()
     if 'current_word' not in st.session_state:
@@ -22,21 +31,48 @@ def main():
         st.session_state.hints_used = 0
     if 'optimal_path' not in st.session_state:
         st.session_state.optimal_path = []
+    if 'optimal_distance' not in st.session_state:
+        st.session_state.optimal_distance = None
     if 'game_over' not in st.session_state:
         st.session_state.game_over = False
     if 'score' not in st.session_state:
         st.session_state.score = 0
     if 'last_hint' not in st.session_state:
         st.session_state.last_hint = ""
+    if 'hint_word' not in st.session_state:
+        st.session_state.hint_word = ""  # Word the last hint was searched from
     if 'search_stats' not in st.session_state:
         st.session_state.search_stats = {}
     if 'move_count' not in st.session_state:
         st.session_state.move_count = 0
+    # Searches running on the game's search service
+    if 'hint_future' not in st.session_state:
+        st.session_state.hint_future = None
+    if 'optimal_future' not in st.session_state:
+        st.session_state.optimal_future = None
+    
+    # Collect the searches that finished since the last run
+    if st.session_state.hint_future is not None and st.session_state.hint_future.done():
+        st.session_state.last_hint, st.session_state.search_stats = st.session_state.hint_future.result()
+        st.session_state.hint_future = None
+    if st.session_state.optimal_future is not None and st.session_state.optimal_future.done():
+        st.session_state.optimal_path, _ = st.session_state.optimal_future.result()
+        st.session_state.optimal_future = None
+        st.session_state.score = st.session_state.game.calculate_player_score(
+            st.session_state.path, 
+            st.session_state.optimal_path, 
+            st.session_state.hints_used
+        )
+    
+    # Start building the shared distance strata in the background
+    st.session_state.game.graph.distance_strata()
     
     # Game settings in sidebar
     st.sidebar.header("Game Settings")
     difficulty = st.sidebar.selectbox("Select Difficulty", ["Easy", "Medium", "Hard"])
-    algorithm = st.sidebar.selectbox("Choose Search Algorithm for Hint", ["A*", "BFS", "UCS", "GBFS"])
+    algorithm = st.sidebar.selectbox("Choose Search Algorithm for Hint", ["A*", "BFS", "Bidirectional BFS", "UCS", "GBFS", "Distance Map"])
+    frontier = st.sidebar.selectbox("Priority Queue (UCS, GBFS, A*)", list(FRONTIERS))
+    st.session_state.game.profile_searches = st.sidebar.checkbox("Profile searches")
     
     # Reset game state
     def reset_game():
@@ -44,37 +80,25 @@ def main():
         st.session_state.hints_used = 0
         st.session_state.path = []
         st.session_state.optimal_path = []
+        st.session_state.optimal_distance = None
         st.session_state.score = 0
         st.session_state.last_hint = ""
+        st.session_state.hint_word = ""
         st.session_state.search_stats = {}
         st.session_state.move_count = 0
+        st.session_state.hint_future = None
+        st.session_state.optimal_future = None
     
     # New game button
     if st.sidebar.button("New Game"):
         reset_game()
-        start, target = st.session_state.game.generate_game_pair(difficulty)
+        # The pair comes with its optimal distance, the optimal path is only searched at game over
+        start, target, optimal_distance = st.session_state.game.new_game(difficulty)
         if start and target:
             st.session_state.current_word = start
             st.session_state.target_word = target
             st.session_state.path = [start]
-            
-            # Calculate optimal path for scoring
-            if algorithm == "BFS":
-                st.session_state.optimal_path, _ = bfs_search(
-                    st.session_state.game.word_tree, start, target
-                )
-            elif algorithm == "UCS":
-                st.session_state.optimal_path, _ = ucs_search(
-                    st.session_state.game.word_tree, start, target
-                )
-            elif algorithm == "GBFS":
-                st.session_state.optimal_path, _ = gbfs_search(
-                    st.session_state.game.word_tree, start, target
-                )
-            else:  # A*
-                st.session_state.optimal_path, _ = a_star_search(
-                    st.session_state.game.word_tree, start, target
-                )
+            st.session_state.optimal_distance = optimal_distance
             
     # Display game info
     if st.session_state.current_word:
@@ -86,6 +110,9 @@ def main():
         with col3:
             st.markdown(f"### Target Word: {st.session_state.target_word}")
         
+        if st.session_state.optimal_distance is not None:
+            st.markdown(f"Optimal ladder: **{st.session_state.optimal_distance} moves**")
+        
         # Display the current path and moves
         st.markdown(f"### Path So Far ({len(st.session_state.path)-1} moves):")
         st.write(" → ".join(st.session_state.path))
@@ -94,15 +121,26 @@ def main():
         hint_col, metrics_col = st.columns([1, 2])
         with hint_col:
             if st.button("Get Hint") and not st.session_state.game_over:
-                hint, stats = st.session_state.game.get_hint(
-                    st.session_state.current_word, st.session_state.target_word, algorithm
+                # Time-bounded so a far-apart pair cannot hold up the search pool
+                st.session_state.hint_word = st.session_state.current_word
+                st.session_state.hint_future = st.session_state.game.submit_hint(
+                    st.session_state.current_word, st.session_state.target_word, algorithm,
+                    time_limit=HINT_TIME_LIMIT, frontier=frontier
                 )
-                st.session_state.last_hint = hint
-                st.session_state.search_stats = stats
                 st.session_state.hints_used += 1
         
-            if st.session_state.last_hint:
+            if st.session_state.hint_future is not None:
+                st.write("Searching for a hint...")
+            elif st.session_state.last_hint:
                 st.info(f"Hint: Move to → **{st.session_state.last_hint}**")
+                if st.session_state.search_stats.get("approximate"):
+                    st.caption("Approximate hint: the search ran out of time before reaching the target")
+                # Every equally short way forward, not just the one the search found
+                best_moves = st.session_state.game.optimal_moves(
+                    st.session_state.current_word, st.session_state.target_word
+                )
+                if len(best_moves) > 1:
+                    st.caption(f"Optimal moves from here: {', '.join(best_moves)}")
                 st.write(f"Hints used: {st.session_state.hints_used}")
         
         with metrics_col:
@@ -114,6 +152,29 @@ def main():
                 c1.metric("Nodes Explored", f"{st.session_state.search_stats.get('nodes_explored', 0)}")
                 c2.metric("Max Queue Size", f"{st.session_state.search_stats.get('max_queue_size', 0)}")
                 c3.metric("Execution Time", f"{st.session_state.search_stats.get('execution_time', 0):.4f} sec")
+                
+                # Per-phase timings, only recorded while profiling is on
+                profile = st.session_state.search_stats.get('profile')
+                if profile:
+                    p1, p2, p3 = metrics_container.columns(3)
+                    p1.metric("Push Time", f"{profile['push_ns'] / 1e6:.2f} ms", f"{profile['pushes']} pushes",
+                              delta_color="off")
+                    p2.metric("Pop Time", f"{profile['pop_ns'] / 1e6:.2f} ms", f"{profile['pops']} pops",
+                              delta_color="off")
+                    p3.metric("Expand Time", f"{profile['expand_ns'] / 1e6:.2f} ms",
+                              f"{profile['expansions']} expansions", delta_color="off")
+                    if profile['frontier']:
+                        st.markdown("Frontier size over expansions")
+                        st.line_chart({"Frontier size": dict(profile['frontier'])})
+
+                # Drawn from the per-word costs, large trees are downsampled per level
+                if st.session_state.search_stats.get('costs') and st.session_state.last_hint:
+                    with st.expander("Explored search tree"):
+                        fig = st.session_state.game.create_search_tree_visualization(
+                            st.session_state.hint_word, st.session_state.search_stats,
+                            highlight=[st.session_state.hint_word, st.session_state.last_hint]
+                        )
+                        st.plotly_chart(fig, use_container_width=True, key="search_tree_chart")
 
         # Display costs for current word options if available
         if (st.session_state.search_stats and 
@@ -132,7 +193,9 @@ def main():
                         "Word": word,
                         "g(x)": costs['g'],
                         "h(x)": costs['h'] if costs['h'] != "N/A" else "N/A",
-                        "f(x)": costs['f'] if costs['f'] != "N/A" else "N/A"
+                        "f(x)": costs['f'] if costs['f'] != "N/A" else "N/A",
+                        # Exact moves left, from the per-game distance map of the target
+                        "h*(x)": st.session_state.game.distance_to_target(word, st.session_state.target_word)
                     })
             
             if costs_data:
@@ -153,26 +216,36 @@ def main():
                     
                     if word == st.session_state.target_word:
                         st.session_state.game_over = True
-                        st.session_state.score = st.session_state.game.calculate_player_score(
-                            st.session_state.path, 
-                            st.session_state.optimal_path, 
-                            st.session_state.hints_used
+                        # Optimal path for scoring, the score is set once it arrives
+                        st.session_state.optimal_future = st.session_state.game.submit_path(
+                            st.session_state.path[0], st.session_state.target_word, "Bidirectional BFS"
                         )
         
         # Path visualization
         if len(st.session_state.path) > 1:
             st.markdown("### Path Visualization:")
             fig = st.session_state.game.create_visualization(st.session_state.path)
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(fig, use_container_width=True, key="player_path_chart")
         
         # Game over display
         if st.session_state.game_over:
             st.balloons()
             st.success(f"🎉 Congratulations! You reached the target word in {len(st.session_state.path)-1} moves!")
             
-            optimal_moves = len(st.session_state.optimal_path) - 1 if st.session_state.optimal_path else "unknown"
-            st.markdown(f"#### Optimal solution: {optimal_moves} moves")
-            st.markdown(f"#### Your score: {st.session_state.score} points")
+            if st.session_state.optimal_future is not None:
+                st.write("Computing the optimal solution...")
+            else:
+                optimal_moves = len(st.session_state.optimal_path) - 1 if st.session_state.optimal_path else "unknown"
+                st.markdown(f"#### Optimal solution: {optimal_moves} moves")
+                st.markdown(f"#### Your score: {st.session_state.score} points")
+                
+                shortest = st.session_state.game.shortest_paths(
+                    st.session_state.path[0], st.session_state.target_word
+                )
+                if shortest.is_shortest_path(st.session_state.path):
+                    st.markdown(f"Your ladder is one of {shortest.count()} shortest ladders!")
+                else:
+                    st.markdown(f"There are {shortest.count()} shortest ladders for this pair.")
             
             if st.session_state.optimal_path:
                 st.markdown("#### Optimal path:")
@@ -181,10 +254,47 @@ def main():
                 # Show optimal path visualization
                 st.markdown("#### Optimal Path Visualization:")
                 fig = st.session_state.game.create_visualization(st.session_state.optimal_path)
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(fig, use_container_width=True, key="optimal_path_chart")
             
     else:
         st.info("Click 'New Game' to start playing!")
+    
+    if st.session_state.hint_future is not None or st.session_state.optimal_future is not None:
+        poll_searches()
+        
+    # Shared word graph info in sidebar
+    with st.sidebar.expander("Word Graph Info"):
+        graph_stats = st.session_state.game.graph_stats()
+        st.write(f"Words: {graph_stats['words']} ({graph_stats['connected_words']} with moves)")
+        st.write(f"Edges: {graph_stats['edges']}")
+        st.write(f"Memory: {graph_stats['memory_bytes'] / 1024 / 1024:.1f} MB")
+        st.write(f"Build time: {graph_stats['build_time']:.2f} sec")
+        if graph_stats["lazy"]:
+            built = ", ".join(str(length) for length in graph_stats["built_lengths"]) or "none"
+            st.write(f"Word lengths built: {built}")
+        cache_stats = st.session_state.game.search_cache_stats()
+        st.write(f"Search cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+                 f"({cache_stats['entries']} entries)")
+        service_stats = st.session_state.game.search_service.stats()
+        st.write(f"Search pool: {service_stats['submitted']} submitted, "
+                 f"{service_stats['deduplicated']} shared, {service_stats['in_flight']} running")
+    
+    # Latency of every search this process has run
+    with st.sidebar.expander("Search Latency"):
+        by = st.radio("Group by", ["difficulty", "word length"], horizontal=True)
+        latency = st.session_state.game.search_latency_stats("difficulty" if by == "difficulty" else "length")
+        if latency:
+            st.table([{
+                "Algorithm": algorithm_name,
+                by.capitalize(): group,
+                "Searches": summary["count"],
+                "p50 (ms)": f"{summary['p50_ms']:.2f}",
+                "p95 (ms)": f"{summary['p95_ms']:.2f}",
+                "p99 (ms)": f"{summary['p99_ms']:.2f}",
+                "Max (ms)": f"{summary['max_ms']:.2f}"
+            } for (algorithm_name, group), summary in latency.items()])
+        else:
+            st.write("No searches yet")
         
     # Instructions in sidebar
     st.sidebar.markdown("---")
@@ -198,19 +308,27 @@ def main():
     
     st.sidebar.markdown("### Difficulty Levels")
     st.sidebar.markdown("""
-    - **Easy**: Shorter words, fewer steps needed
-    - **Medium**: Medium length words, moderate path length
-    - **Hard**: Longer words, more complex paths
+    - **Easy**: 3-letter words, 2-4 moves needed
+    - **Medium**: 4-letter words, 4-6 moves needed
+    - **Hard**: 5 or 6-letter words, 6-10 moves needed
     """)
     
     st.sidebar.markdown("### Search Algorithms")
     st.sidebar.markdown("""
     - **A***: Uses both path cost and heuristic
     - **BFS**: Breadth-First Search, finds shortest path
+    - **Bidirectional BFS**: BFS from both words at once, meets in the middle
     - **UCS**: Uniform Cost Search, considers edge costs
     - **GBFS**: Greedy Best-First Search, uses only heuristic
+    - **Distance Map**: One BFS from the target per game, then every hint is instant
+    """)
+    
+    st.sidebar.markdown("### Priority Queues")
+    st.sidebar.markdown("""
+    - **Binary heap**: Pushes a word again every time it is reached
+    - **Binary heap, deduplicated**: Skips pushes no cheaper than an earlier one
+    - **Bucket queue (Dial)**: One bucket per integer cost, deduplicated
     """)
 
 if __name__ == "__main__":
-    from algorithms import bfs_search, ucs_search, gbfs_search, a_star_search
     main()
\ No newline at end of file
@@ -2,6 +2,9 @@
 
 class Node:
     """Node class for search algorithms"""
+    # No per-instance __dict__, searches create one node per pushed word
+    __slots__ = ("word", "parent", "path_cost", "heuristic_cost", "total_cost")
+    
     def __init__(self, word, parent=None, path_cost=0, heuristic_cost=0):
         self.word = word
         self.parent = parent
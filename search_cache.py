@@ -0,0 +1,85 @@
+# search_cache.py - Contains the LRU/TTL cache for hint and optimal-path searches
+
+from collections import OrderedDict
+import threading
+import time
+
+# Algorithms that always return a shortest path, so their results are interchangeable
+OPTIMAL_ALGORITHMS = {"A*", "BFS", "Bidirectional BFS", "UCS"}
+# Key prefix for shortest-path suffixes shared by all optimal algorithms
+OPTIMAL = "optimal"
+
+class SearchCache:
+    """Bounded cache of search results keyed by (algorithm, start, target)
+
+    Least recently used entries are evicted once `max_entries` is reached,
+    and entries older than `ttl` seconds (if set) are treated as misses.
+    Shortest paths also answer later queries from any word along them: the
+    suffix from each intermediate word is itself a shortest path.
+    """
+    def __init__(self, max_entries=4096, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (stored_at, path, stats)
+        self._lock = threading.Lock()
+
+    def get(self, algorithm, start, target):
+        """Return a cached (path, stats) pair, or None on a miss"""
+        keys = [(algorithm, start, target)]
+        if algorithm in OPTIMAL_ALGORITHMS:
+            keys.append((OPTIMAL, start, target))
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                stored_at, path, stats = entry
+                if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                    del self._entries[key]
+                    continue
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return list(path), dict(stats, cached=True)
+            self.misses += 1
+            return None
+
+    def put(self, algorithm, start, target, path, stats):
+        """Store a search result, plus its suffixes when the path is optimal"""
+        now = time.monotonic()
+        with self._lock:
+            self._store((algorithm, start, target), now, path, stats)
+            if algorithm in OPTIMAL_ALGORITHMS and path:
+                # No search ran for the suffixes, so they carry empty statistics
+                for i, word in enumerate(path):
+                    suffix = path[i:]
+                    suffix_stats = {
+                        "nodes_explored": 0,
+                        "max_queue_size": 0,
+                        "execution_time": 0,
+                        "costs": {w: {"g": g, "h": "N/A", "f": "N/A"} for g, w in enumerate(suffix)}
+                    }
+                    self._store((OPTIMAL, word, target), now, suffix, suffix_stats)
+
+    def _store(self, key, now, path, stats):
+        self._entries[key] = (now, tuple(path), stats)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every entry (the counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
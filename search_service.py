@@ -0,0 +1,88 @@
+# search_service.py - Contains the executor-backed search service used for hints and optimal paths
+
+# concurrent.futures loads its pool modules on first attribute access, the process
+# pool (and multiprocessing) is only imported when a process service starts
+import concurrent.futures
+import threading
+from utils import word_sources
+
+# Game used by pool worker processes, one per process
+_worker_game = None
+
+def _init_worker(word_file):
+    global _worker_game
+    from word_ladder import WordLadderGame  # word_ladder imports this module
+    _worker_game = WordLadderGame(word_file)
+
+def _call_worker_game(method, *args):
+    return getattr(_worker_game, method)(*args)
+
+class SearchService:
+    """Runs game searches on a thread or process pool and hands back futures
+
+    Identical requests submitted while one is still running share its
+    future, so many sessions asking for the same hint cost one search.
+    Requests only count as identical when the games' search settings (see
+    WordLadderGame.search_settings) match as well, since the first game
+    runs the search for all of them. With
+    `use_processes` each worker loads its own game (from the graph cache),
+    which keeps long searches off the GIL of the web server's threads.
+    """
+    def __init__(self, word_file='wordslist.txt', use_processes=False, max_workers=None):
+        self.word_file = word_file
+        self.use_processes = use_processes
+        if use_processes:
+            self._executor = concurrent.futures.ProcessPoolExecutor(max_workers, initializer=_init_worker, initargs=(word_file,))
+        else:
+            self._executor = concurrent.futures.ThreadPoolExecutor(max_workers, thread_name_prefix="search")
+        self._in_flight = {}  # request key -> future
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.deduplicated = 0
+
+    def submit(self, game, method, *args):
+        """Run game.<method>(*args) on the pool, returns a Future of its result"""
+        key = (method, *args, game.search_settings())
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.deduplicated += 1
+                return future
+            if self.use_processes:
+                future = self._executor.submit(_call_worker_game, method, *args)
+            else:
+                future = self._executor.submit(getattr(game, method), *args)
+            self._in_flight[key] = future
+            self.submitted += 1
+        # Runs right away if the future already finished
+        future.add_done_callback(lambda done: self._forget(key, done))
+        return future
+
+    def _forget(self, key, future):
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    def stats(self):
+        """Submitted, deduplicated and in-flight request counts"""
+        with self._lock:
+            return {
+                "submitted": self.submitted,
+                "deduplicated": self.deduplicated,
+                "in_flight": len(self._in_flight)
+            }
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait)
+
+# One service per word file and pool kind for the whole process
+_services = {}
+_services_lock = threading.Lock()
+
+def get_search_service(word_file='wordslist.txt', use_processes=False, max_workers=None):
+    """Return the process-wide search service, starting its pool on first use"""
+    key = (word_sources(word_file), use_processes)
+    with _services_lock:
+        if key not in _services:
+            _services[key] = SearchService(word_file, use_processes, max_workers)
+        return _services[key]
@@ -0,0 +1,130 @@
+# shortest_paths.py - Contains the all-shortest-paths DAG and the k-shortest ladder enumeration
+
+import heapq
+from itertools import count, islice
+from algorithms import bfs_distances
+from node import Node
+
+class ShortestPathDAG:
+    """Every shortest ladder between two words, as one shared layered DAG
+
+    Layer i holds the words i moves from the start that lie on some shortest
+    ladder to the target, and `successors[word]` lists their moves into the
+    next layer. Ladders are never stored one by one: there can be thousands,
+    while the DAG stays the size of the words involved.
+    """
+    def __init__(self, start, target, layers, successors):
+        self.start = start
+        self.target = target
+        self.layers = layers  # list of lists of words, start first, [] when unreachable
+        self.successors = successors  # word -> optimal next moves
+
+    @classmethod
+    def build(cls, word_tree, start, target):
+        """Layered BFS from the start up to the target's layer, then pruned back from the target"""
+        predecessors = {start: []}
+        depth = {start: 0}
+        layers = [[start]]
+        while target not in depth and layers[-1]:
+            next_depth = len(layers)
+            next_layer = []
+            for word in layers[-1]:
+                for neighbor in word_tree.get(word, []):
+                    if neighbor not in depth:
+                        depth[neighbor] = next_depth
+                        predecessors[neighbor] = [word]
+                        next_layer.append(neighbor)
+                    elif depth[neighbor] == next_depth:
+                        # Another shortest way into the same word
+                        predecessors[neighbor].append(word)
+            layers.append(next_layer)
+        if target not in predecessors:
+            return cls(start, target, [], {})
+
+        # Keep only the words that lead to the target, walking back layer by layer
+        successors = {target: []}
+        kept_layers = [[target]]
+        for _ in range(len(layers) - 1):
+            previous = []
+            for word in kept_layers[-1]:
+                for predecessor in predecessors[word]:
+                    if predecessor not in successors:
+                        successors[predecessor] = []
+                        previous.append(predecessor)
+                    successors[predecessor].append(word)
+            kept_layers.append(previous)
+        return cls(start, target, kept_layers[::-1], successors)
+
+    @property
+    def distance(self):
+        """Moves in a shortest ladder, None if the target cannot be reached"""
+        return len(self.layers) - 1 if self.layers else None
+
+    def next_moves(self, word):
+        """Every optimal next move from a word on a shortest ladder"""
+        return self.successors.get(word, [])
+
+    def count(self):
+        """Number of distinct shortest ladders, counted over the DAG without listing them"""
+        if not self.layers:
+            return 0
+        ways = {self.target: 1}
+        for layer in reversed(self.layers[:-1]):
+            for word in layer:
+                ways[word] = sum(ways[successor] for successor in self.successors[word])
+        return ways[self.start]
+
+    def paths(self, limit=None):
+        """Yield shortest ladders one at a time (depth first), at most `limit` of them"""
+        if not self.layers:
+            return iter(())
+        return islice(self._paths([self.start]), limit)
+
+    def _paths(self, prefix):
+        word = prefix[-1]
+        if word == self.target:
+            yield list(prefix)
+            return
+        for successor in self.successors[word]:
+            prefix.append(successor)
+            yield from self._paths(prefix)
+            prefix.pop()
+
+    def is_shortest_path(self, path):
+        """Whether `path` is one of the shortest ladders, in O(len(path))"""
+        if not self.layers or len(path) != len(self.layers) or path[0] != self.start:
+            return False
+        return all(following in self.successors.get(word, ())
+                   for word, following in zip(path, path[1:]))
+
+def k_shortest_paths(word_tree, start, target, k, distances=None, max_nodes=200000):
+    """Yield up to k loopless ladders in order of length, shortest first
+
+    A best-first search over partial ladders, guided by the exact distance to
+    the target (one reverse BFS, or `distances` if already known), so no
+    partial ladder that cannot finish within the current length is expanded.
+    Ladders share their prefixes through the Node parent chain. Stops after
+    `max_nodes` expansions, long detours can be numerous.
+    """
+    if distances is None:
+        distances = bfs_distances(word_tree, target)
+    if start not in distances:
+        return
+    tie_breaker = count()
+    frontier = [(distances[start], next(tie_breaker), Node(start, None, 0, distances[start]))]
+    found = 0
+    expansions = 0
+    while frontier and found < k and expansions < max_nodes:
+        _, _, node = heapq.heappop(frontier)
+        if node.word == target:
+            found += 1
+            yield node.get_path()
+            continue
+        expansions += 1
+        on_path = set(node.get_path())
+        for neighbor in word_tree.get(node.word, []):
+            if neighbor in on_path:
+                continue
+            g = node.path_cost + 1
+            child = Node(neighbor, node, g, distances[neighbor])
+            heapq.heappush(frontier, (child.total_cost, next(tie_breaker), child))
@@ -0,0 +1,106 @@
+# strata.py - Contains the precomputed distance strata used to pick game pairs
+
+from collections import defaultdict
+import random
+from algorithms import bfs_distances
+
+# Word lengths and (shortest, longest) optimal ladder length for each difficulty
+DIFFICULTY_LEVELS = {
+    "Easy": ([3], (2, 4)),
+    "Medium": ([4], (4, 6)),
+    "Hard": ([5, 6], (6, 10))
+}
+
+class DistanceStrata:
+    """Reachable (start, target) pairs bucketed by exact shortest-path distance
+
+    `pairs[length][distance]` holds a bounded sample of pairs of `length`
+    letter words whose optimal ladder takes exactly `distance` moves.
+    """
+    def __init__(self, pairs):
+        self.pairs = pairs
+        self._pools = {}  # difficulty -> flat list of (start, target, distance)
+
+    @classmethod
+    def build(cls, word_tree, sources_per_length=100, max_pairs_per_distance=1000, seed=0):
+        """Sample source words per length class and bucket the pairs they reach"""
+        rng = random.Random(seed)
+        words_by_length = defaultdict(list)
+        for word in sorted(word_tree):
+            words_by_length[len(word)].append(word)
+
+        strata = cls({})
+        for length, words in words_by_length.items():
+            strata.add_length(word_tree, length, words, rng, sources_per_length, max_pairs_per_distance)
+        return strata
+
+    def add_length(self, word_tree, length, words, rng=random, sources_per_length=100,
+                   max_pairs_per_distance=1000):
+        """Sample the pairs of one length class
+
+        One BFS per source gives the exact distance to every word in its
+        component. Each bucket keeps a uniform reservoir sample of its pairs.
+        """
+        buckets = defaultdict(list)
+        seen = defaultdict(int)  # Pairs offered to each bucket, for reservoir sampling
+        for source in rng.sample(words, min(sources_per_length, len(words))):
+            for target, distance in bfs_distances(word_tree, source).items():
+                if distance == 0:
+                    continue
+                seen[distance] += 1
+                bucket = buckets[distance]
+                if len(bucket) < max_pairs_per_distance:
+                    bucket.append((source, target))
+                else:
+                    slot = rng.randrange(seen[distance])
+                    if slot < max_pairs_per_distance:
+                        bucket[slot] = (source, target)
+        self.pairs[length] = dict(buckets)
+        # Pools drawn before this length was added are stale
+        self._pools = {}
+
+    def pool(self, difficulty):
+        """All sampled (start, target, distance) triples in a difficulty's band"""
+        pools = self._pools  # add_length may swap in a fresh dict meanwhile
+        if difficulty not in pools:
+            lengths, (shortest, longest) = DIFFICULTY_LEVELS.get(difficulty, DIFFICULTY_LEVELS["Hard"])
+            pool = []
+            for length in lengths:
+                for distance, bucket in self.pairs.get(length, {}).items():
+                    if shortest <= distance <= longest:
+                        pool.extend((start, target, distance) for start, target in bucket)
+            pools[difficulty] = pool
+        return pools[difficulty]
+
+    def draw(self, difficulty, rng=random):
+        """Pick a (start, target, distance) triple for a difficulty in O(1)
+
+        Returns None when no sampled pair falls in the difficulty's band.
+        """
+        pool = self.pool(difficulty)
+        return rng.choice(pool) if pool else None
+
+def draw_bounded(word_tree, words_of_length, difficulty, rng=random, attempts=8):
+    """Pick a (start, target, distance) triple in a difficulty's band without the strata
+
+    Runs a BFS from a random start word that stops at the band's longest
+    distance, then picks a target inside the band. Used while the strata
+    are still being built; returns None if `attempts` start words all fail.
+    """
+    lengths, (shortest, longest) = DIFFICULTY_LEVELS.get(difficulty, DIFFICULTY_LEVELS["Hard"])
+    length = rng.choice(lengths)
+    words = words_of_length(length)
+    for start in rng.sample(words, min(attempts, len(words))):
+        band = [(target, distance) for target, distance in bfs_distances(word_tree, start, longest).items()
+                if distance >= shortest]
+        if band:
+            target, distance = rng.choice(band)
+            return start, target, distance
+    return None
+
+def difficulty_for_length(length):
+    """Difficulty whose games use words of `length` letters, None for other lengths"""
+    for difficulty, (lengths, _) in DIFFICULTY_LEVELS.items():
+        if length in lengths:
+            return difficulty
+    return None
@@ -1,87 +1,109 @@
-import plotly.graph_objects as go
-import networkx as nx
+from collections import defaultdict
+import gzip
+import os
 import random
 
-def load_words(filename):
-    """Load words from a file into a set"""
+def word_sources(sources):
+    """A path or a list of paths as a tuple of absolute paths, e.g. for cache keys"""
+    if isinstance(sources, (str, os.PathLike)):
+        sources = [sources]
+    return tuple(os.path.abspath(source) for source in sources)
+
+def read_chunks(sources, chunk_size=1 << 20):
+    """Yield large blocks of whole lines from one or more word files
+
+    `sources` is a path or a list of paths; paths ending in .gz are
+    decompressed on the fly.
+    """
+    if isinstance(sources, (str, os.PathLike)):
+        sources = [sources]
+    for source in sources:
+        opener = gzip.open if str(source).endswith(".gz") else open
+        with opener(source, 'rt', encoding='utf-8') as file:
+            remainder = ""
+            while True:
+                chunk = file.read(chunk_size)
+                if not chunk:
+                    break
+                # Hold back the partial last line until the next chunk completes it
+                end = chunk.rfind("\n") + 1
+                if not end:
+                    remainder += chunk
+                    continue
+                yield remainder + chunk[:end]
+                remainder = chunk[end:]
+            if remainder:
+                yield remainder
+
+def word_filter(min_length=3, max_length=6, alphabet=None):
+    """Predicate keeping the stripped, lowercased words the loaders keep
+
+    Words must have min_length to max_length letters, and only letters of
+    `alphabet` when one is given.
+    """
+    letters = set(alphabet) if alphabet is not None else None
+    def keep(word):
+        return (min_length <= len(word) <= max_length and word.isalpha()
+                and (letters is None or letters.issuperset(word)))
+    return keep
+
+def _iter_word_blocks(sources, min_length, max_length, alphabet, chunk_size):
+    """Yield the set of words first seen in each block of the files, see iter_words_by_length"""
+    letters = set(alphabet) if alphabet is not None else None
+    seen = set()
+    for block in read_chunks(sources, chunk_size):
+        # Same checks as word_filter, inline: a Python call per line costs more than the whole filter.
+        # Lines are only lowercased once the cheap length and isalpha checks pass
+        words = {word.lower() for word in map(str.strip, block.splitlines())
+                 if min_length <= len(word) <= max_length and word.isalpha()}
+        if letters is not None:
+            words = {word for word in words if letters.issuperset(word)}
+        words -= seen
+        seen |= words
+        yield words
+
+def iter_words_by_length(sources, min_length=3, max_length=6, alphabet=None,
+                         batch_size=4096, chunk_size=1 << 20):
+    """Stream normalized words grouped by length as (length, [words]) batches
+
+    Each line is stripped once and, if it passes the length filter,
+    lowercased once; then it is filtered by alphabet (letters only by
+    default), which keeps the same words as word_filter. Duplicates are
+    dropped. After each block, every length with at least `batch_size`
+    words is yielded, so consumers can start on a length before the whole
+    file is read.
+    """
+    batches = defaultdict(list)
+    for words in _iter_word_blocks(sources, min_length, max_length, alphabet, chunk_size):
+        for word in words:
+            batches[len(word)].append(word)
+        for length, batch in list(batches.items()):
+            if len(batch) >= batch_size:
+                yield length, batch
+                batches[length] = []
+    for length, batch in sorted(batches.items()):
+        if batch:
+            yield length, batch
+
+def load_words(filename, min_length=3, max_length=6, alphabet=None, fallback=True):
+    """Load words from one or more files into a set
+
+    If a file is missing and `fallback` is set, a small test set of words is
+    returned instead (with a warning); otherwise FileNotFoundError is raised.
+    """
     try:
-        with open(filename, 'r') as file:
-            # Keep words that are 3-6 letters long and only contain letters
-            return {word.strip().lower() for word in file 
-                   if 3 <= len(word.strip()) <= 6 and word.strip().isalpha()}
+        # Blocks straight into one set, the per-length batches would only be merged again
+        words = set()
+        for block_words in _iter_word_blocks(filename, min_length, max_length, alphabet, 1 << 20):
+            words |= block_words
+        return words
     except FileNotFoundError:
+        if not fallback:
+            raise
         print(f"Could not find {filename}. Using a small test set of words.")
         # Fallback to a small set of words for testing
         return {"cat", "bat", "hat", "rat", "mat", "sat", "pat", "eat", "fat", "fit", "hit", "kit", "lit", "pit"}
 
-def calculate_hamming_distance(word1, word2):
-    """Calculate the Hamming distance between two words"""
-    return sum(1 for a, b in zip(word1, word2) if a != b)
-
-def create_graph_visualization(path):
-    """Create a visualization of the word ladder path"""
-    # Create a directed graph
-    graph = nx.DiGraph()
-    
-    # Add nodes and edges
-    for i in range(len(path) - 1):
-        graph.add_edge(path[i], path[i+1])
-        
-    # Calculate positions
-    positions = {node: (i, 0) for i, node in enumerate(path)}
-    
-    # Create edges trace
-    edge_x = []
-    edge_y = []
-    for edge in graph.edges():
-        x0, y0 = positions[edge[0]]
-        x1, y1 = positions[edge[1]]
-        edge_x.extend([x0, x1, None])
-        edge_y.extend([y0, y1, None])
-        
-    edge_trace = go.Scatter(
-        x=edge_x, y=edge_y,
-        line=dict(width=2, color='#888'),
-        hoverinfo='none',
-        mode='lines')
-    
-    # Create nodes trace
-    node_x = [positions[node][0] for node in graph.nodes()]
-    node_y = [positions[node][1] for node in graph.nodes()]
-    
-    # Choose colors: start=orange, end=blue, middle=green
-    node_colors = ['#FF9500' if i == 0 else '#00BFFF' if i == len(path)-1 else '#1FCC92' 
-                  for i in range(len(path))]
-    
-    node_trace = go.Scatter(
-        x=node_x, y=node_y,
-        mode='markers+text',
-        text=list(graph.nodes()),
-        textposition="top center",
-        marker=dict(
-            showscale=False,
-            color=node_colors,
-            size=20,
-            line=dict(width=2, color='white')
-        )
-    )
-    
-    # Create figure
-    figure = go.Figure(
-        data=[edge_trace, node_trace],
-        layout=go.Layout(
-            showlegend=False,
-            hovermode='closest',
-            margin=dict(b=20, l=5, r=5, t=40),
-            xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
-            yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
-            height=200,
-            plot_bgcolor='rgba(0,0,0,0)'
-        )
-    )
-                  
-    return figure
-
 def calculate_score(player_path, optimal_path, hints_used):
     """Calculate player's score based on path efficiency and hints used"""
     if not player_path or not optimal_path:
@@ -97,12 +119,16 @@ def calculate_score(player_path, optimal_path, hints_used):
     score = int(base_score * efficiency_factor - hint_penalty)
     return max(score, 0)  # Ensure score is not negative
 
-def generate_word_pair(word_tree, difficulty):
-    """Generate start and target words based on difficulty"""
-    word_list = list(word_tree.keys())
-    if not word_list:
-        print("No words available. Please check your word list file.")
-        return "", ""
+def generate_word_pair(word_tree, difficulty, components=None, words_of_length=None):
+    """Generate start and target words based on difficulty
+
+    When `components` (a WordComponents) is given, the target is drawn from
+    the start word's component so a ladder between them always exists.
+    `words_of_length(length)` lists the candidate words of one length; by
+    default they are filtered out of the whole tree.
+    """
+    if words_of_length is None:
+        words_of_length = lambda length: [w for w in word_tree if len(w) == length]
         
     # Filter words by length based on difficulty
     if difficulty == "Easy":
@@ -110,18 +136,24 @@ def generate_word_pair(word_tree, difficulty):
     elif difficulty == "Medium":
         word_length = 4
     else:  # Hard
-        word_length = [5, 6]  # Use longer words for hard difficulty
+        # Use longer words for hard difficulty, both words share one length
+        word_length = random.choice([5, 6])
         
-    if isinstance(word_length, list):
-        filtered_words = [w for w in word_list if len(w) in word_length]
-    else:
-        filtered_words = [w for w in word_list if len(w) == word_length]
+    filtered_words = words_of_length(word_length)
         
     if len(filtered_words) < 2:
+        word_list = list(word_tree.keys())
+        if not word_list:
+            print("No words available. Please check your word list file.")
+            return "", ""
         print(f"Not enough words for {difficulty} difficulty. Using all available words.")
         filtered_words = word_list
     
-    # Just return a random pair for simplicity
     start = random.choice(filtered_words)
-    target = random.choice([w for w in filtered_words if w != start])
+    if components is not None:
+        # Every word in the tree has a neighbor, so its component has another word
+        candidates = components.component_of(start)
+    else:
+        candidates = filtered_words
+    target = random.choice([w for w in candidates if w != start])
     return start, target
\ No newline at end of file
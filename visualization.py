@@ -0,0 +1,242 @@
+# visualization.py - Contains the plotly figures of the game, kept out of the headless core
+#
+# plotly takes a few hundred milliseconds to import, so nothing outside the
+# UI imports this module; WordLadderGame loads it on first use.
+
+from collections import OrderedDict
+import plotly.graph_objects as go
+
+# Path node colors: start=orange, end=blue, middle=green
+START_COLOR = '#FF9500'
+END_COLOR = '#00BFFF'
+MIDDLE_COLOR = '#1FCC92'
+EDGE_COLOR = '#888'
+
+# Explored search trees larger than this are downsampled level by level
+MAX_TREE_POINTS = 400
+# Word labels are only drawn on trees with at most this many points, hover shows the rest
+MAX_TREE_LABELS = 60
+
+def _path_colors(length):
+    return [START_COLOR if i == 0 else END_COLOR if i == length - 1 else MIDDLE_COLOR
+            for i in range(length)]
+
+def _path_edges(length):
+    """x and y of the edges between consecutive path positions, None-separated"""
+    edge_x = []
+    for i in range(length - 1):
+        edge_x.extend([i, i + 1, None])
+    return edge_x, [None if x is None else 0 for x in edge_x]
+
+def _layout(height):
+    return go.Layout(
+        showlegend=False,
+        hovermode='closest',
+        margin=dict(b=20, l=5, r=5, t=40),
+        xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+        yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+        height=height,
+        plot_bgcolor='rgba(0,0,0,0)'
+    )
+
+def create_graph_visualization(path):
+    """Create a visualization of the word ladder path, one point per move"""
+    edge_x, edge_y = _path_edges(len(path))
+    edge_trace = go.Scatter(
+        x=edge_x, y=edge_y,
+        line=dict(width=2, color=EDGE_COLOR),
+        hoverinfo='none',
+        mode='lines')
+
+    node_trace = go.Scatter(
+        x=list(range(len(path))), y=[0] * len(path),
+        mode='markers+text',
+        text=list(path),
+        textposition="top center",
+        marker=dict(
+            showscale=False,
+            color=_path_colors(len(path)),
+            size=20,
+            line=dict(width=2, color='white')
+        )
+    )
+
+    return go.Figure(data=[edge_trace, node_trace], layout=_layout(200))
+
+def extend_graph_visualization(figure, path):
+    """Update a figure of path[:-k] in place so it shows `path`
+
+    Only the trace arrays are replaced, the figure and its layout are kept,
+    which is much cheaper than building a new figure for every move.
+    """
+    edge_x, edge_y = _path_edges(len(path))
+    edge_trace, node_trace = figure.data
+    with figure.batch_update():
+        edge_trace.x, edge_trace.y = edge_x, edge_y
+        node_trace.x, node_trace.y = list(range(len(path))), [0] * len(path)
+        node_trace.text = list(path)
+        node_trace.marker.color = _path_colors(len(path))
+    return figure
+
+class PathFigures:
+    """Path figures memoized by path, extended in place as a ladder grows
+
+    Asking for a path whose prefix already has a figure moves that figure
+    over to the longer path instead of drawing it again, the common case
+    when a player appends a move. Keeps the `maxsize` most recent figures.
+    Not thread-safe, each game (session) has its own.
+    """
+    def __init__(self, maxsize=8):
+        self.maxsize = maxsize
+        self._figures = OrderedDict()  # tuple(path) -> figure
+        self.hits = 0
+        self.extended = 0
+        self.created = 0
+
+    def get(self, path):
+        """The figure of `path`, from the memo, a prefix's figure, or drawn anew"""
+        key = tuple(path)
+        figure = self._figures.get(key)
+        if figure is not None:
+            self._figures.move_to_end(key)
+            self.hits += 1
+            return figure
+        prefix = next((key[:end] for end in range(len(key) - 1, 0, -1) if key[:end] in self._figures), None)
+        if prefix is not None:
+            # The prefix's figure now shows the longer path, so it leaves the memo
+            figure = extend_graph_visualization(self._figures.pop(prefix), key)
+            self.extended += 1
+        else:
+            figure = create_graph_visualization(key)
+            self.created += 1
+        self._figures[key] = figure
+        if len(self._figures) > self.maxsize:
+            self._figures.popitem(last=False)
+        return figure
+
+def search_tree_parents(word_tree, costs, start):
+    """Parent and depth of every word a search reached, inferred from its statistics
+
+    Searches record g (moves from the start) per word but not how it was
+    reached, and a later push can overwrite g with a larger value. So words
+    are placed in order of g, each under its shallowest neighbor already
+    placed. Words without one are left out.
+    """
+    parents = {start: None}
+    depths = {start: 0}
+    reached = sorted((word_costs["g"], word) for word, word_costs in costs.items()
+                     if word != start and isinstance(word_costs["g"], int))
+    for _, word in reached:
+        placed = [neighbor for neighbor in word_tree.get(word, []) if neighbor in depths]
+        if placed:
+            parent = min(placed, key=depths.get)
+            parents[word] = parent
+            depths[word] = depths[parent] + 1
+    return parents, depths
+
+def _level_quotas(sizes, max_points):
+    """Points per level: small levels keep every word, the rest share what is left evenly"""
+    quotas = {}
+    remaining = max_points
+    levels = sorted(sizes, key=sizes.get)
+    for i, level in enumerate(levels):
+        share = max(1, remaining // (len(levels) - i))
+        quotas[level] = min(sizes[level], share)
+        remaining -= quotas[level]
+    return quotas
+
+def downsample_search_tree(parents, depths, highlight=(), max_points=MAX_TREE_POINTS):
+    """Words to draw per level of the tree, about `max_points` in all
+
+    Highlighted words and their ancestors are always kept. Going down
+    level by level, the rest of each level's quota is sampled evenly (in
+    alphabetical order) among the words whose parent is kept, so the drawn
+    tree stays connected. Returns {level: kept words} and {level: size}.
+    """
+    levels = {}
+    for word, depth in depths.items():
+        levels.setdefault(depth, []).append(word)
+    sizes = {level: len(words) for level, words in levels.items()}
+    quotas = _level_quotas(sizes, max_points)
+    kept = set()
+    for word in highlight:
+        while word in parents and word not in kept:
+            kept.add(word)
+            word = parents[word]
+    kept_levels = {}
+    for level in sorted(levels):
+        words = sorted(levels[level])
+        candidates = [word for word in words
+                      if word not in kept and (parents[word] is None or parents[word] in kept)]
+        quota = min(len(candidates), quotas[level] - sum(word in kept for word in words))
+        if quota > 0:
+            kept.update(candidates[i * len(candidates) // quota] for i in range(quota))
+        kept_levels[level] = [word for word in words if word in kept]
+    return kept_levels, sizes
+
+def create_search_tree_visualization(word_tree, costs, start, highlight=(), max_points=MAX_TREE_POINTS):
+    """Draw the tree a search explored, one column per move from the start
+
+    Built from the per-word g/h/f costs of the search statistics. Trees
+    with more than `max_points` words are downsampled (see
+    downsample_search_tree) and each column is labelled "shown/total".
+    """
+    parents, depths = search_tree_parents(word_tree, costs, start)
+    kept_levels, sizes = downsample_search_tree(parents, depths, highlight, max_points)
+
+    # Order each column by its parents' positions so edges cross as little as possible
+    positions = {}
+    for level in sorted(kept_levels):
+        words = sorted(kept_levels[level],
+                       key=lambda word: (positions.get(parents[word], (0, 0))[1], word))
+        for i, word in enumerate(words):
+            positions[word] = (level, i - (len(words) - 1) / 2)
+
+    edge_x = []
+    edge_y = []
+    for word, (x, y) in positions.items():
+        parent = parents[word]
+        if parent in positions:
+            parent_x, parent_y = positions[parent]
+            edge_x.extend([parent_x, x, None])
+            edge_y.extend([parent_y, y, None])
+    edge_trace = go.Scatter(
+        x=edge_x, y=edge_y,
+        line=dict(width=1, color=EDGE_COLOR),
+        hoverinfo='none',
+        mode='lines')
+
+    highlight = list(highlight)
+    words = list(positions)
+    colors = [START_COLOR if word == start else
+              END_COLOR if highlight and word == highlight[-1] else
+              MIDDLE_COLOR if word in highlight else '#BBBBBB'
+              for word in words]
+    hover = [f"{word}: g={costs[word]['g']} h={costs[word]['h']} f={costs[word]['f']}"
+             if word in costs else word for word in words]
+    node_trace = go.Scatter(
+        x=[positions[word][0] for word in words],
+        y=[positions[word][1] for word in words],
+        mode='markers+text' if len(words) <= MAX_TREE_LABELS else 'markers',
+        text=words,
+        hovertext=hover,
+        hoverinfo='text',
+        textposition="top center",
+        marker=dict(color=colors, size=10 if len(words) <= MAX_TREE_LABELS else 6)
+    )
+
+    # "shown/total" under every column, the level of detail at a glance
+    top = min((y for _, y in positions.values()), default=0) - 1
+    count_trace = go.Scatter(
+        x=sorted(kept_levels),
+        y=[top] * len(kept_levels),
+        mode='text',
+        text=[f"{len(kept_levels[level])}/{sizes[level]}" for level in sorted(kept_levels)],
+        hoverinfo='none'
+    )
+
+    figure = go.Figure(data=[edge_trace, node_trace, count_trace], layout=_layout(400))
+    shown = sum(len(words) for words in kept_levels.values())
+    figure.update_layout(title=dict(text=f"{shown} of {len(parents)} reached words shown",
+                                    font=dict(size=14)))
+    return figure
@@ -1,42 +1,62 @@
 # word_ladder.py - Contains the WordLadderGame class
 
-from collections import defaultdict
-import string
 import time
-from utils import load_words, create_graph_visualization, calculate_score, generate_word_pair
-from algorithms import bfs_search, ucs_search, gbfs_search, a_star_search
+from utils import calculate_score, generate_word_pair
+from algorithms import FRONTIER_ALGORITHMS, HEURISTIC_ALGORITHMS, SEARCH_ALGORITHMS, bfs_distances
+from frontier import DEFAULT_FRONTIER, FRONTIERS
+from graph import build_word_tree, get_shared_graph, have_numpy
+from instrumentation import SearchProfile, search_latency
+from search_service import get_search_service
+from shortest_paths import ShortestPathDAG, k_shortest_paths
+from strata import difficulty_for_length, draw_bounded
+
+# Hint "algorithm" that follows a BFS distance map from the target instead of searching
+DISTANCE_MAP = "Distance Map"
+# Seconds a hint search may run before it answers with its best partial path
+HINT_TIME_LIMIT = 0.5
 
 class WordLadderGame:
-    def __init__(self, word_file='wordslist.txt'):
-        """Initialize the word ladder game"""
-        self.words = load_words(word_file)
-        self.word_tree = {}  # Initialize as empty
-        if self.words:
-            self.word_tree = self.build_word_tree()
+    def __init__(self, word_file='wordslist.txt', graph=None, profile_searches=False, profile_hook=None,
+                 search_service=None):
+        """Initialize the word ladder game on the shared, read-only word graph
+
+        With `profile_searches` (or a `profile_hook`, see SearchProfile) every
+        search records per-phase timings in its statistics under "profile".
+        `search_service` runs the submit_* searches, by default the shared
+        thread pool for `word_file` (see search_service.py).
+        """
+        self.word_file = word_file
+        # Lengths are built as games need them, the rest is built in the background
+        self.graph = graph if graph is not None else get_shared_graph(word_file, lazy=True, warm=True)
+        self.word_tree = self.graph.word_tree
+        # Per-target memos, each one (target, graph version, value) tuple. Pool threads
+        # and the UI thread both fill them, so a memo is only ever read and replaced
+        # whole and a target can never be paired with another target's value.
+        self._distance_memo = (None, None, {})  # Distances to the target, see distance_map
+        self._hamming_memo = (None, None, None)  # Hamming distances of its length, see hamming_table
+        self._dag_memo = (None, None, None)  # ((start, target), version, last ShortestPathDAG built)
+        self.profile_searches = profile_searches
+        self.profile_hook = profile_hook
+        self._search_service = search_service
+        self._path_figures = None  # visualization.PathFigures, made on first use
+        self._tree_figure = None  # Last explored-tree figure, with the costs it was drawn from
+
+    @property
+    def words(self):
+        """All loaded words, including those without moves"""
+        return self.graph.words
             
     def build_word_tree(self):
         """Build a tree of words that differ by one letter"""
-        tree = defaultdict(list)
-        words_by_length = defaultdict(list)
-        
-        # Group words by length
-        for word in self.words:
-            words_by_length[len(word)].append(word)
-        
-        # For each group of same-length words
-        for length, words_list in words_by_length.items():
-            for word in words_list:
-                # Try changing each position to each letter
-                for i in range(length):
-                    for letter in string.ascii_lowercase:
-                        new_word = word[:i] + letter + word[i+1:]
-                        # Add to tree if it's a valid word and not the same word
-                        if new_word in self.words and new_word != word:
-                            tree[word].append(new_word)
-        return tree
-
-    def get_hint(self, start_word, target_word, algorithm):
-        """Get a hint for the next move using the selected algorithm"""
+        return build_word_tree(self.words)
+
+    def get_hint(self, start_word, target_word, algorithm, max_nodes=None, time_limit=None, frontier=None):
+        """Get a hint for the next move using the selected algorithm
+
+        With a node or time budget the search may stop early, the hint then
+        heads for its most promising word and stats["approximate"] is set.
+        `frontier` names the priority queue to use, see find_path.
+        """
         # Reset statistics
         stats = {
             "nodes_explored": 0,
@@ -49,27 +69,278 @@ class WordLadderGame:
         if start_word not in self.word_tree or target_word not in self.word_tree:
             return "Hint not available", stats
         
-        # Run the selected algorithm
-        if algorithm == "BFS":
-            path, stats = bfs_search(self.word_tree, start_word, target_word)
-        elif algorithm == "UCS":
-            path, stats = ucs_search(self.word_tree, start_word, target_word)
-        elif algorithm == "GBFS":
-            path, stats = gbfs_search(self.word_tree, start_word, target_word)
-        else:  # A*
-            path, stats = a_star_search(self.word_tree, start_word, target_word)
+        # Run the selected algorithm (the distance map only needs the first move)
+        if algorithm == DISTANCE_MAP and self.graph.components.connected(start_word, target_word):
+            path, stats = self._follow_distance_map(start_word, target_word, max_moves=1)
+            self._record_latency(algorithm, start_word, stats)
+        else:
+            # The hint's cost table shows the per-word g/h/f values
+            path, stats = self.find_path(start_word, target_word, algorithm, max_nodes, time_limit, frontier,
+                                         record_costs=True)
         
         # Return the next word in the path as a hint
         return path[1] if len(path) > 1 else "No hint available", stats
 
+    def find_path(self, start_word, target_word, algorithm, max_nodes=None, time_limit=None, frontier=None,
+                  record_costs=False):
+        """Find a path between two words using the selected algorithm (A* by default)
+
+        `max_nodes` and `time_limit` (seconds) bound the search, see algorithms.py.
+        A search that runs out returns a partial path flagged "approximate".
+        `frontier` is a name from frontier.FRONTIERS for UCS, GBFS and A*,
+        the binary heap when None. With `record_costs` stats["costs"] holds
+        the g/h/f values of every word the search reached.
+        """
+        if not self.graph.components.connected(start_word, target_word):
+            # Different components: no ladder exists, skip the search entirely
+            stats = {
+                "nodes_explored": 0,
+                "max_queue_size": 0,
+                "execution_time": 0,
+                "costs": {},
+                "unreachable": True
+            }
+            return [], stats
+        if algorithm == DISTANCE_MAP:
+            path, stats = self._follow_distance_map(start_word, target_word)
+            self._record_latency(algorithm, start_word, stats)
+            return path, stats
+        if algorithm not in SEARCH_ALGORITHMS:
+            algorithm = "A*"
+        cache_name = algorithm
+        options = {"max_nodes": max_nodes, "time_limit": time_limit, "record_costs": record_costs}
+        if frontier not in (None, DEFAULT_FRONTIER) and algorithm in FRONTIER_ALGORITHMS:
+            # Other frontiers explore differently, keep their results and statistics apart
+            cache_name = f"{algorithm} ({frontier})"
+            options["frontier"] = FRONTIERS[frontier]
+        cached = self.graph.search_cache.get(cache_name, start_word, target_word)
+        # A result cached without its costs cannot fill a cost table, search again
+        if cached is not None and (cached[1].get("costs_recorded", True) or not record_costs):
+            return cached
+        if self.profile_searches or self.profile_hook is not None:
+            options["profile"] = SearchProfile(self.profile_hook)
+        if algorithm in HEURISTIC_ALGORITHMS:
+            # max(Hamming, landmark) bound, tighter than Hamming and still admissible
+            options["heuristic"] = self.graph.landmark_index().heuristic_to(
+                target_word, self.hamming_table(target_word))
+        path, stats = SEARCH_ALGORITHMS[algorithm](self.word_tree, start_word, target_word, **options)
+        stats["costs_recorded"] = record_costs
+        self._record_latency(algorithm, start_word, stats)
+        if not stats.get("approximate"):
+            # Partial paths would look like answers to later, unbounded lookups
+            self.graph.search_cache.put(cache_name, start_word, target_word, path, stats)
+        return path, stats
+
+    def _record_latency(self, algorithm, start_word, stats):
+        """Add a search's time to the process-wide histograms, see instrumentation.py"""
+        length = len(start_word)
+        search_latency.record(algorithm, difficulty_for_length(length), length,
+                              round(stats["execution_time"] * 1e9))
+
+    def search_settings(self):
+        """Everything besides a search's arguments that shapes its answer and statistics
+
+        Games only share an in-flight search (see SearchService) when these match.
+        """
+        return (id(self.graph), self.graph.version, self.profile_searches, self.profile_hook)
+
+    @property
+    def search_service(self):
+        """Pool that runs the submitted searches"""
+        if self._search_service is None:
+            self._search_service = get_search_service(self.word_file)
+        return self._search_service
+
+    def submit_hint(self, start_word, target_word, algorithm, max_nodes=None, time_limit=None, frontier=None):
+        """Run get_hint off the calling thread, returns a Future of (hint, stats)"""
+        return self.search_service.submit(self, "get_hint", start_word, target_word, algorithm,
+                                          max_nodes, time_limit, frontier)
+
+    def submit_path(self, start_word, target_word, algorithm):
+        """Run find_path off the calling thread, returns a Future of (path, stats)"""
+        future = self.search_service.submit(self, "find_path", start_word, target_word, algorithm)
+        if self.search_service.use_processes:
+            # Worker processes fill their own caches, keep the answer here as well
+            future.add_done_callback(lambda done: self._cache_result(done, algorithm, start_word, target_word))
+        return future
+
+    def _cache_result(self, future, algorithm, start_word, target_word):
+        if future.cancelled() or future.exception() is not None:
+            return
+        path, stats = future.result()
+        if algorithm in SEARCH_ALGORITHMS and not stats.get("approximate") and not stats.get("cached"):
+            self.graph.search_cache.put(algorithm, start_word, target_word, path, stats)
+
+    def distance_map(self, target_word):
+        """Moves from every word in the target's component to the target
+
+        One reverse BFS per target: word graphs are undirected, so distances
+        from the target are distances to it. Later calls reuse the map.
+        """
+        target, version, distances = self._distance_memo
+        if target != target_word or version != self.graph.version:
+            version = self.graph.version
+            distances = bfs_distances(self.word_tree, target_word)
+            self._distance_memo = (target_word, version, distances)
+        return distances
+
+    def hamming_table(self, target_word):
+        """{word: Hamming distance to target} for every word of the target's length
+
+        Computed in one vectorized pass over the graph's word matrix and
+        kept for the game, so searches look distances up instead of counting
+        letters per pushed word. None without numpy.
+        """
+        if not have_numpy():
+            return None
+        target, version, table = self._hamming_memo
+        if target != target_word or version != self.graph.version:
+            version = self.graph.version
+            table = self.graph.word_matrix(len(target_word)).hamming_table(target_word)
+            self._hamming_memo = (target_word, version, table)
+        return table
+
+    def distance_to_target(self, word, target_word):
+        """Exact number of moves from `word` to the target, None if unreachable"""
+        return self.distance_map(target_word).get(word)
+
+    def optimal_moves(self, word, target_word):
+        """Every move from `word` that starts a shortest ladder to the target"""
+        distances = self.distance_map(target_word)
+        distance = distances.get(word)
+        if not distance:
+            return []
+        return [neighbor for neighbor in self.word_tree.get(word, []) if distances.get(neighbor) == distance - 1]
+
+    def validate_path(self, path, target_word):
+        """Check a player's ladder in O(len(path)) against the target's distance map
+
+        Returns whether every move is legal, whether the ladder reaches the
+        target, and how many moves it took beyond the shortest ladder.
+        """
+        distances = self.distance_map(target_word)
+        valid = bool(path) and all(following in self.word_tree.get(word, ())
+                                   for word, following in zip(path, path[1:]))
+        complete = valid and path[-1] == target_word
+        shortest = distances.get(path[0]) if path else None
+        return {
+            "valid": valid,
+            "complete": complete,
+            "optimal": complete and len(path) - 1 == shortest,
+            "extra_moves": len(path) - 1 - shortest if complete and shortest is not None else None
+        }
+
+    def shortest_paths(self, start_word, target_word):
+        """All shortest ladders between two words as a ShortestPathDAG, the last one is kept"""
+        pair, version, dag = self._dag_memo
+        if pair != (start_word, target_word) or version != self.graph.version:
+            version = self.graph.version
+            dag = ShortestPathDAG.build(self.word_tree, start_word, target_word)
+            self._dag_memo = ((start_word, target_word), version, dag)
+        return dag
+
+    def k_shortest_paths(self, start_word, target_word, k):
+        """Up to k loopless ladders, shortest first, reusing the target's distance map"""
+        if not self.graph.components.connected(start_word, target_word):
+            return []
+        return list(k_shortest_paths(self.word_tree, start_word, target_word, k,
+                                     self.distance_map(target_word)))
+
+    def _follow_distance_map(self, start_word, target_word, max_moves=None):
+        """Walk down the distance map, each step takes the closest neighbor
+
+        Each step costs O(degree); `max_moves` stops the walk early.
+        """
+        start_time = time.perf_counter()
+        distances = self.distance_map(target_word)
+        stats = {
+            "nodes_explored": 0,
+            "max_queue_size": 0,
+            "execution_time": 0,
+            "costs": {}
+        }
+        
+        # Exact h(x) for the start word and every move from it
+        for word in [start_word, *self.word_tree.get(start_word, [])]:
+            g = 0 if word == start_word else 1
+            stats["costs"][word] = {"g": g, "h": distances[word], "f": g + distances[word]}
+        
+        path = [start_word]
+        while path[-1] != target_word and (max_moves is None or len(path) <= max_moves):
+            stats["nodes_explored"] += 1
+            path.append(min(self.word_tree.get(path[-1], []), key=distances.__getitem__))
+        stats["execution_time"] = time.perf_counter() - start_time
+        return path, stats
+
+    def add_words(self, words):
+        """Add words to the shared graph in place, returns the words that were new"""
+        return self.graph.add_words(words)
+
+    def remove_words(self, words):
+        """Remove words from the shared graph in place, returns the words that were removed"""
+        return self.graph.remove_words(words)
+
     def generate_game_pair(self, difficulty):
         """Generate a pair of words for a new game based on difficulty"""
-        return generate_word_pair(self.word_tree, difficulty)
+        return generate_word_pair(self.word_tree, difficulty, self.graph.components,
+                                  self.graph.words_of_length)
+
+    def new_game(self, difficulty):
+        """Pick a (start, target, optimal_distance) triple for a new game
+
+        Pairs come from the precomputed distance strata, so the optimal
+        ladder length is known without a search. While the strata are still
+        being built in the background, a BFS bounded by the difficulty's band
+        picks the pair instead (see strata.draw_bounded). Only when that
+        finds nothing either is a random pair with an unknown (None)
+        distance returned.
+        """
+        strata = self.graph.distance_strata()
+        drawn = strata.draw(difficulty) if strata is not None else None
+        if drawn is None:
+            drawn = draw_bounded(self.word_tree, self.graph.words_of_length, difficulty)
+        if drawn is None:
+            drawn = (*self.generate_game_pair(difficulty), None)
+        if drawn[1]:
+            # Every hint search of this game heads for this target
+            self.hamming_table(drawn[1])
+        return drawn
 
     def create_visualization(self, path):
-        """Create a visualization of the path"""
-        return create_graph_visualization(path)
+        """Create a visualization of the path, memoized and extended move by move"""
+        if self._path_figures is None:
+            # Imported here so batch jobs and pool workers never load the plotting libraries
+            from visualization import PathFigures
+            self._path_figures = PathFigures()
+        return self._path_figures.get(path)
+
+    def create_search_tree_visualization(self, start_word, stats, highlight=()):
+        """Draw the tree a search explored from its statistics, downsampled when large
+
+        The figure is kept until different statistics are passed in, so
+        reruns that show the same hint do not draw it again.
+        """
+        costs = stats.get("costs", {})
+        request = (start_word, tuple(highlight))
+        if self._tree_figure is not None and self._tree_figure[0] is costs and self._tree_figure[1] == request:
+            return self._tree_figure[2]
+        from visualization import create_search_tree_visualization
+        figure = create_search_tree_visualization(self.word_tree, costs, start_word, highlight)
+        self._tree_figure = (costs, request, figure)
+        return figure
         
+    def graph_stats(self):
+        """Memory footprint and build time of the shared word graph"""
+        return self.graph.stats()
+
+    def search_cache_stats(self):
+        """Hit/miss counters of the shared search cache"""
+        return self.graph.search_cache.stats()
+
+    def search_latency_stats(self, by="difficulty"):
+        """Latency percentiles of this process's searches, see SearchLatency.summary"""
+        return search_latency.summary(by)
+
     def calculate_player_score(self, player_path, optimal_path, hints_used):
         """Calculate player's score"""
         return calculate_score(player_path, optimal_path, hints_used)
\ No newline at end of file
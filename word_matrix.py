@@ -0,0 +1,109 @@
+# word_matrix.py - Contains the NumPy word matrices for bulk Hamming distances and neighbor discovery
+#
+# numpy is optional and takes over 100 ms to import, so the core modules
+# only import this module when they need it. Without numpy HAVE_NUMPY is
+# False and callers keep to the pure-Python paths.
+
+from collections import defaultdict
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HAVE_NUMPY = np is not None
+
+class WordMatrix:
+    """Words of one length as rows of a uint8 matrix, one column per letter
+
+    Letters are numbered in code point order, so any alphabet of up to 256
+    letters fits. Rows follow the sorted words.
+    """
+    def __init__(self, words):
+        if np is None:
+            raise ImportError("WordMatrix needs numpy")
+        self.words = sorted(words)
+        self.length = len(self.words[0]) if self.words else 0
+        if any(len(word) != self.length for word in self.words):
+            raise ValueError("WordMatrix words must all have the same length")
+        self.index = {word: row for row, word in enumerate(self.words)}
+        codes = np.frombuffer("".join(self.words).encode("utf-32-le"), dtype=np.uint32)
+        self.alphabet, letters = np.unique(codes, return_inverse=True)
+        if len(self.alphabet) > 256:
+            raise ValueError("WordMatrix supports at most 256 distinct letters")
+        self.matrix = letters.astype(np.uint8).reshape(len(self.words), self.length)
+
+    def __len__(self):
+        return len(self.words)
+
+    def encode(self, word):
+        """A word's row, or for words not in the matrix its letters encoded the same way
+
+        Letters outside the alphabet get a code no row has at that position.
+        """
+        row = self.index.get(word)
+        if row is not None:
+            return self.matrix[row]
+        codes = np.array([ord(letter) for letter in word], dtype=np.uint32)
+        positions = np.searchsorted(self.alphabet, codes)
+        known = (positions < len(self.alphabet)) & (self.alphabet[np.minimum(positions, len(self.alphabet) - 1)] == codes)
+        # Letters outside the alphabet become -1, which matches no uint8 code
+        return np.where(known, positions, -1)
+
+    def hamming_to(self, target):
+        """Hamming distance from every row to `target`, in one vectorized pass"""
+        return (self.matrix != self.encode(target)).sum(axis=1, dtype=np.uint8)
+
+    def hamming_table(self, target):
+        """{word: Hamming distance to target} for every word of this length"""
+        return dict(zip(self.words, self.hamming_to(target).tolist()))
+
+    def neighbor_pairs(self):
+        """Every Hamming-1 pair as (rows, neighbor rows) arrays, in build_word_tree's order
+
+        For each position the rows are stably sorted on the other columns,
+        so words differing only there end up next to each other (the
+        wildcard buckets of build_word_tree); every pair inside a group is
+        an edge. Pairs come out ordered by row, then position, then neighbor.
+        """
+        count = len(self.words)
+        all_rows = []
+        all_neighbors = []
+        for position in range(self.length):
+            others = np.delete(self.matrix, position, axis=1)
+            # lexsort sorts on its last key first and is stable, rows stay alphabetical in a group
+            order = np.lexsort(others.T[::-1]) if others.shape[1] else np.arange(count)
+            ordered = others[order]
+            starts = np.flatnonzero(np.r_[True, (ordered[1:] != ordered[:-1]).any(axis=1)])
+            sizes = np.diff(np.r_[starts, count])
+            pair_counts = np.repeat(sizes, sizes)  # Pairs per sorted row, its group's size
+            lefts = np.repeat(np.arange(count), pair_counts)
+            offsets = np.arange(pair_counts.sum()) - np.repeat(np.cumsum(pair_counts) - pair_counts, pair_counts)
+            rights = np.repeat(np.repeat(starts, sizes), pair_counts) + offsets
+            distinct = lefts != rights
+            all_rows.append(order[lefts[distinct]])
+            all_neighbors.append(order[rights[distinct]])
+        if not all_rows:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+        rows = np.concatenate(all_rows)
+        neighbors = np.concatenate(all_neighbors)
+        by_row = np.argsort(rows, kind="stable")
+        return rows[by_row], neighbors[by_row]
+
+    def neighbor_lists(self):
+        """{word: [neighbors]} for the words with at least one neighbor"""
+        rows, neighbors = self.neighbor_pairs()
+        neighbor_words = np.array(self.words, dtype=object)[neighbors].tolist()
+        bounds = np.searchsorted(rows, np.arange(len(self.words) + 1)).tolist()
+        return {word: neighbor_words[bounds[row]:bounds[row + 1]]
+                for row, word in enumerate(self.words) if bounds[row] != bounds[row + 1]}
+
+def build_word_tree_vectorized(words):
+    """Build the same tree as graph.build_word_tree, one WordMatrix per word length"""
+    words_by_length = defaultdict(list)
+    for word in words:
+        words_by_length[len(word)].append(word)
+    tree = defaultdict(list)
+    for length_words in words_by_length.values():
+        tree.update(WordMatrix(length_words).neighbor_lists())
+    return tree